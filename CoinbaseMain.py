@@ -1,20 +1,58 @@
 import requests
-import csv
-from io import StringIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from io import BytesIO
 import os
+import sys
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import json  # For webhook payload
-from datetime import datetime  # For timestamp in embed
-from openai import OpenAI
+
+try:
+    import orjson  # Optional: faster JSON, falls back to stdlib json
+except ImportError:
+    orjson = None
+from datetime import datetime, timezone  # For timestamp in embed
+from decimal import Decimal
 from dotenv import load_dotenv
+import numpy as np
 import pandas as pd
-import mplfinance as mpf
-from io import BytesIO
 import re
 import uuid  # For generating unique order IDs
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Exchange-read and webhook warnings go through a bounded queue drained by a
+# background thread, so a slow stdout never blocks the run
+log = logging.getLogger("elbota")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = queue.Queue(maxsize=1000)
+log.addHandler(QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Order placement/cancellation messages, successes and failures alike
+# (LOG_LEVEL=WARNING silences the routine ones). Written synchronously, not
+# through the queue, so they stay in order with print()
+trade_log = logging.getLogger("elbota.trade")
+trade_log.propagate = False
+_trade_log_handler = logging.StreamHandler(sys.stdout)
+_trade_log_handler.setFormatter(logging.Formatter("%(message)s"))
+trade_log.addHandler(_trade_log_handler)
+_log_level = (os.getenv("LOG_LEVEL") or "INFO").upper()
+if _log_level not in logging.getLevelNamesMapping():
+    print(f"⚠️ Unknown LOG_LEVEL {_log_level!r} - using INFO")
+    _log_level = "INFO"
+trade_log.setLevel(_log_level)
+
 
 # ============================================================================
 # CONFIGURATION - Futures Trading Settings
@@ -24,10 +62,15 @@ CRYPTO_SYMBOL = "ETH"  # For display purposes
 TIMEFRAME_MINUTES = 120  # How many minutes of data to fetch
 CONTRACTS_PER_TRADE = 1  # Number of contracts to trade (0.1 ETH each)
 CONTRACT_MULTIPLIER = 0.1  # 0.1 ETH per contract for nano ETH futures
+FUTURES_TICK_SIZE = 1  # Order prices are rounded to this (multiple of the product tick)
 
 # Order execution settings
 ORDER_TYPE = "limit"  # "market" or "limit" - market is faster, limit avoids spread
 
+# Environment settings, read once at startup (.env is loaded above)
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")  # Unset = print, don't post
+GITHUB_RUN_ID = os.getenv("GITHUB_RUN_ID", "Local")  # Shown in the Discord footer
+
 
 # ChatGPT model selection - TIME-BASED
 def get_model_for_time():
@@ -66,6 +109,53 @@ MAX_DISTANCE_PERCENT = 2.90  # Maximum 0.50% distance (keeps stops reasonable)
 
 # Derived values
 CRYPTO_LOWER = CRYPTO_SYMBOL.lower()
+_POS_MULTIPLIER = CONTRACTS_PER_TRADE * CONTRACT_MULTIPLIER  # ETH per position, for P/L
+
+
+def _tick_round(price, tick=FUTURES_TICK_SIZE):
+    """Round a price to the nearest valid tick (int for whole-dollar ticks)
+
+    Decimal keeps fractional ticks exact (4000.3, never 4000.300000000003),
+    since the result is sent to Coinbase as the order price string.
+    """
+    step = Decimal(str(tick))
+    rounded = (Decimal(str(price)) / step).to_integral_value() * step
+    return int(rounded) if step == step.to_integral_value() else float(rounded)
+
+
+# response type -> to_dict function (or empty fallback); plain dicts pass through
+_TO_DICT_BY_TYPE = {dict: lambda obj: obj}
+
+
+def _as_dict(obj):
+    """Convert a Coinbase SDK response object to a dict ({} if not convertible)"""
+    obj_type = type(obj)
+    to_dict = _TO_DICT_BY_TYPE.get(obj_type)
+    if to_dict is None:
+        to_dict = getattr(obj_type, "to_dict", None) or (lambda _obj: {})
+        _TO_DICT_BY_TYPE[obj_type] = to_dict
+    return to_dict(obj)
+
+
+def _field(obj, name, default=None):
+    """Read one field of a Coinbase SDK response (typed object or plain dict)"""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _json_loads(text):
+    """Parse JSON (orjson when installed); bad input raises json.JSONDecodeError"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _json_dumps(obj, indent=False):
+    """Serialize to a JSON string (orjson when installed); indent=True for 2 spaces"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None)
 
 
 # ============================================================================
@@ -73,107 +163,301 @@ CRYPTO_LOWER = CRYPTO_SYMBOL.lower()
 # ============================================================================
 
 
+_CLIENTS = {"coinbase": None, "openai": None}  # API clients, built once per process
+
+# Coinbase request timeout: generous enough for order placement, but a stalled
+# connection can no longer hang the run (the SDK default is no timeout at all)
+COINBASE_TIMEOUT_SECONDS = 30
+
+
+def get_coinbase_client():
+    """Return the shared Coinbase RESTClient (created on first use)"""
+    if _CLIENTS["coinbase"] is None:
+        from coinbase.rest import RESTClient
+
+        _CLIENTS["coinbase"] = RESTClient(
+            api_key=os.getenv("COINBASE_API_KEY"),
+            api_secret=os.getenv("COINBASE_API_SECRET"),
+            timeout=COINBASE_TIMEOUT_SECONDS,
+        )
+    return _CLIENTS["coinbase"]
+
+
+def get_openai_client():
+    """Return the shared OpenAI client (created on first use)"""
+    if _CLIENTS["openai"] is None:
+        from openai import OpenAI
+
+        _CLIENTS["openai"] = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _CLIENTS["openai"]
+
+
+class _LoggedRetry(Retry):
+    """urllib3 Retry that reports every retry on the bot log"""
+
+    def increment(
+        self, method=None, url=None, response=None, error=None, *args, **kwargs
+    ):
+        # Raises (or gives up) once retries run out, so only real retries are logged
+        retry = super().increment(method, url, response, error, *args, **kwargs)
+        reason = response.status if response is not None else error
+        log.warning(
+            "   ⚠️ Webhook request failed (%s) - retrying (%s left)",
+            reason,
+            retry.total,
+        )
+        return retry
+
+
+# Shared HTTP session for webhook posts (keeps the Discord connection alive).
+# Failed connections and 429/5xx answers - including for the POST itself - are
+# retried with exponential backoff, waiting out Discord's Retry-After on 429s.
+# Once retries run out the last response is returned instead of raising.
+_HTTP = requests.Session()
+_HTTP.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=_LoggedRetry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ),
+    ),
+)
+HTTP_TIMEOUT_SECONDS = 10  # Never let a hung webhook stall the run
+
+# Heartbeat: once the last Discord post is this old, a quiet run (flat + HOLD)
+# posts anyway, with a chart. Just under an hour, so a late cron start still counts
+QUIET_HEARTBEAT_MINUTES = 55
+
+# Flat (no position) record: the initial state and what closing a position resets to
+_EMPTY_POSITION = {
+    "status": "none",
+    "entry_price": None,
+    "entry_time": None,
+    "entry_ts": None,  # entry_time as unix seconds (what check_stop_target compares against)
+    "stop_loss": None,
+    "take_profit": None,
+    "trade_id": None,
+    "action": None,
+    "entry_order_id": None,  # Entry order ID (so unfilled limit orders can be cancelled)
+    "bracket_order_id": None,  # Stop-loss + take-profit (OCO) order
+    "unrealized_pnl": None,
+}
+
+# In-memory position state (positions.json is read once per process), plus the
+# file's text as last read/written so unchanged state is never rewritten
+_STATE = {"data": None, "text": None}
+
+# Closed trades live in an append-only log (one JSON object per line) so the
+# per-run state rewrite stays small no matter how long the history gets
+TRADES_FILE = "trades.jsonl"
+
+
+def append_trade(trade):
+    """Append one closed trade to the trade log
+
+    Args:
+        trade: Trade record (type, entry/exit price and time, profit_loss, note)
+    """
+    with open(TRADES_FILE, "a") as f:
+        f.write(_json_dumps(trade) + "\n")
+
+
+def load_trades():
+    """Read the closed-trade log (oldest first)
+
+    Returns:
+        list: Trade records, empty if no trade has been logged yet
+    """
+    if not os.path.exists(TRADES_FILE):
+        return []
+    with open(TRADES_FILE, "r") as f:
+        return [_json_loads(line) for line in f if line.strip()]
+
+
 def load_positions():
-    """Load current position state from positions.json"""
+    """Load current position state (from memory, or positions.json on first call)"""
+    if _STATE["data"] is not None:
+        return _STATE["data"]
+
     positions_file = "positions.json"
 
     # Create file if it doesn't exist
     if not os.path.exists(positions_file):
         default_state = {
-            "current_position": {
-                "status": "none",
-                "entry_price": None,
-                "entry_time": None,
-                "stop_loss": None,
-                "take_profit": None,
-                "trade_id": None,
-                "action": None,
-                "entry_order_id": None,  # ADDED: Track entry order ID for limit orders
-                "stop_loss_order_id": None,
-                "take_profit_order_id": None,
-                "unrealized_pnl": None,
-            },
+            "current_position": dict(_EMPTY_POSITION),
             "last_signal": "hold",
-            "trade_history": [],
             "total_trades": 0,
             "winning_trades": 0,
             "losing_trades": 0,
+            "total_profit": 0.0,  # Running sum of winning P/L
+            "total_loss": 0.0,  # Running sum of losing P/L (positive number)
+            "last_post_ts": None,  # Unix time of the last Discord post (heartbeat clock)
         }
+        text = _json_dumps(default_state, indent=True)
         with open(positions_file, "w") as f:
-            json.dump(default_state, f, indent=2)
+            f.write(text)
+        _STATE["data"] = default_state
+        _STATE["text"] = text
         return default_state
 
     with open(positions_file, "r") as f:
-        return json.load(f)
+        _STATE["text"] = f.read()
+    data = _json_loads(_STATE["text"])
+
+    # Older files kept the whole trade history inline - move it to the trade log
+    # (only once: if the log already exists the inline copy is just dropped)
+    legacy_history = data.pop("trade_history", None)
+    if legacy_history and not os.path.exists(TRADES_FILE):
+        for trade in legacy_history:
+            append_trade(trade)
+
+    # Older files have no running P/L totals - add them up from the trade log once
+    if "total_profit" not in data:
+        data["total_profit"] = 0.0
+        data["total_loss"] = 0.0
+        for trade in load_trades():
+            pl = trade["profit_loss"]
+            if pl > 0:
+                data["total_profit"] += pl
+            else:
+                data["total_loss"] -= pl
+
+    # Older files only have the ISO entry_time - derive the unix timestamp once
+    pos = data["current_position"]
+    if "entry_ts" not in pos:
+        entry_time = pos.get("entry_time")
+        pos["entry_ts"] = (
+            int(datetime.fromisoformat(entry_time).timestamp()) if entry_time else None
+        )
+
+    # Older files tracked separate stop-loss/take-profit order IDs - now one bracket.
+    # Any that are still set may be live on the exchange, so they are queued in
+    # legacy_order_ids until they are cancelled (see _cancel_legacy_orders)
+    legacy_ids = [
+        pos.pop(legacy_key, None)
+        for legacy_key in ("stop_loss_order_id", "take_profit_order_id")
+    ]
+    legacy_ids = [oid for oid in legacy_ids if oid]
+    if legacy_ids:
+        pos["legacy_order_ids"] = pos.get("legacy_order_ids", []) + legacy_ids
+    pos.setdefault("bracket_order_id", None)
+
+    _STATE["data"] = data
+    return data
+
+
+def save_positions(positions_data, durable=False):
+    """Save position state to positions.json and keep it as the in-memory state
+
+    Writes a temp file and renames it over positions.json, so a crash mid-write
+    never leaves a truncated state file. Skipped when the serialized state is
+    identical to the file's current contents (e.g. a quiet flat/HOLD run).
+
+    Args:
+        positions_data: Position state data
+        durable: fsync the state and the trade log (set when a trade was closed)
+    """
+    _STATE["data"] = positions_data
+    text = _json_dumps(positions_data, indent=True)
+    if text == _STATE["text"]:
+        return
+    tmp_file = "positions.json.tmp"
+    with open(tmp_file, "w") as f:
+        f.write(text)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_file, "positions.json")
 
+    if durable and os.path.exists(TRADES_FILE):
+        with open(TRADES_FILE, "a") as f:
+            os.fsync(f.fileno())
+    _STATE["text"] = text
 
-def save_positions(positions_data):
-    """Save position state to positions.json"""
-    with open("positions.json", "w") as f:
-        json.dump(positions_data, f, indent=2)
 
+def compute_stats(positions_data):
+    """Summarize closed-trade performance from the running counters and P/L totals
 
-def check_stop_target(positions_data, csv_data):
+    Returns:
+        dict: total, wins, losses, win_rate (%), avg_win, avg_loss, avg_ratio
+    """
+    total = positions_data.get("total_trades", 0)
+    wins = positions_data.get("winning_trades", 0)
+    losses = positions_data.get("losing_trades", 0)
+    total_profit = positions_data.get("total_profit", 0.0)
+    total_loss = positions_data.get("total_loss", 0.0)
+
+    avg_win = (total_profit / wins) if wins > 0 else 0
+    avg_loss = (total_loss / losses) if losses > 0 else 0
+    return {
+        "total": total,
+        "wins": wins,
+        "losses": losses,
+        "win_rate": (wins / total * 100) if total > 0 else 0,
+        "avg_win": avg_win,
+        "avg_loss": avg_loss,
+        "avg_ratio": (avg_win / avg_loss) if avg_loss > 0 else avg_win,
+    }
+
+
+def check_stop_target(positions_data, candles):
     """Check if stop-loss or take-profit has been hit by analyzing candle highs/lows
 
+    Advisory backup only - the exchange-side bracket order closes the position
+    and cancels its other leg on its own.
+
+    Args:
+        positions_data: Position state data
+        candles: OHLCV DataFrame from fetch_btc_data()
+
     Returns:
-        tuple: (should_close, reason, exit_price, orders_to_cancel)
+        tuple: (should_close, reason, exit_price)
     """
     pos = positions_data["current_position"]
 
     if pos["status"] == "none":
-        return False, None, None, []
-
-    # Parse CSV data to get candles
-    lines = csv_data.strip().split("\n")[1:]  # Skip header
-    candles = []
-    for line in lines:
-        parts = line.split(",")
-        candles.append(
-            {
-                "timestamp": int(parts[0]),
-                "high": float(parts[2]),
-                "low": float(parts[3]),
-            }
-        )
+        return False, None, None
 
-    # Filter candles after entry_time
-    from dateutil import parser
+    # Nothing to scan for if neither level is set
+    take_profit = pos["take_profit"]
+    stop_loss = pos["stop_loss"]
+    if not take_profit and not stop_loss:
+        return False, None, None
 
-    entry_timestamp = int(parser.parse(pos["entry_time"]).timestamp())
-    relevant_candles = [c for c in candles if c["timestamp"] >= entry_timestamp]
+    # Candles after entry: timestamps are sorted, so binary-search the first one
+    start = candles["Timestamp"].to_numpy().searchsorted(pos["entry_ts"])
+    highs = candles["High"].to_numpy()[start:]
+    lows = candles["Low"].to_numpy()[start:]
 
-    # Prepare order IDs to cancel
-    stop_order_id = pos.get("stop_loss_order_id")
-    tp_order_id = pos.get("take_profit_order_id")
+    no_hit = np.zeros(len(highs), dtype=bool)
 
-    # For LONG positions: check each candle chronologically
+    # Flag every candle that touches a level (long: target above, stop below;
+    # short: the other way round)
     if pos["status"] == "long":
-        for candle in relevant_candles:
-            # If target hit in this candle, return it and cancel stop order
-            if pos["take_profit"] and candle["high"] >= pos["take_profit"]:
-                orders_to_cancel = [stop_order_id] if stop_order_id else []
-                return True, "target_hit", pos["take_profit"], orders_to_cancel
-
-            # If stop hit in this candle, return it and cancel target order
-            if pos["stop_loss"] and candle["low"] <= pos["stop_loss"]:
-                orders_to_cancel = [tp_order_id] if tp_order_id else []
-                return True, "stop_hit", pos["stop_loss"], orders_to_cancel
-
-    # For SHORT positions: check each candle chronologically
+        target_hit = highs >= take_profit if take_profit else no_hit
+        stop_hit = lows <= stop_loss if stop_loss else no_hit
     elif pos["status"] == "short":
-        for candle in relevant_candles:
-            # If target hit in this candle, return it and cancel stop order
-            if pos["take_profit"] and candle["low"] <= pos["take_profit"]:
-                orders_to_cancel = [stop_order_id] if stop_order_id else []
-                return True, "target_hit", pos["take_profit"], orders_to_cancel
-
-            # If stop hit in this candle, return it and cancel target order
-            if pos["stop_loss"] and candle["high"] >= pos["stop_loss"]:
-                orders_to_cancel = [tp_order_id] if tp_order_id else []
-                return True, "stop_hit", pos["stop_loss"], orders_to_cancel
+        target_hit = lows <= take_profit if take_profit else no_hit
+        stop_hit = highs >= stop_loss if stop_loss else no_hit
+    else:
+        return False, None, None
 
-    return False, None, None, []
+    # First candle (chronologically) that hit either level decides;
+    # if both were hit in the same candle the target wins
+    any_hit = target_hit | stop_hit
+    if not any_hit.any():
+        return False, None, None
+    first = any_hit.argmax()
+    if target_hit[first]:
+        return True, "target_hit", take_profit
+    return True, "stop_hit", stop_loss
 
 
 def execute_real_futures_trade(action, contracts, client, limit_price=None):
@@ -207,7 +491,7 @@ def execute_real_futures_trade(action, contracts, client, limit_price=None):
         # Execute order based on ORDER_TYPE setting
         if ORDER_TYPE == "limit" and limit_price is not None:
             # LIMIT ORDER - avoids spread but may not fill immediately
-            limit_price_rounded = int(round(limit_price))
+            limit_price_rounded = _tick_round(limit_price)
             if order_side == "BUY":
                 order = client.limit_order_gtc_buy(
                     client_order_id=client_order_id,
@@ -238,7 +522,7 @@ def execute_real_futures_trade(action, contracts, client, limit_price=None):
                 )
 
         # Convert response object to dict
-        order_dict = order.to_dict() if hasattr(order, "to_dict") else {}
+        order_dict = _as_dict(order)
 
         if order_dict.get("success", False):
             order_id = order_dict.get("success_response", {}).get("order_id", "unknown")
@@ -246,20 +530,18 @@ def execute_real_futures_trade(action, contracts, client, limit_price=None):
             # Fetch status separately
             try:
                 status_resp = client.get_order(order_id=order_id)
-                # Convert status response to dict
-                status_resp_dict = (
-                    status_resp.to_dict() if hasattr(status_resp, "to_dict") else {}
+                # Read the status attribute directly (no to_dict() of the whole order)
+                order_info = (
+                    _field(status_resp, "order", None)
+                    if _field(status_resp, "success", False)
+                    else None
                 )
-                status_dict = (
-                    status_resp_dict.get("order", {})
-                    if status_resp_dict.get("success", False)
-                    else {}
-                )
-                status = status_dict.get(
-                    "status", "FILLED"
-                )  # Market IOC usually FILLED
+                # Market IOC orders are usually FILLED
+                status = _field(order_info, "status", "FILLED")
             except Exception as status_err:
-                print(f"Warning: Could not fetch order status: {str(status_err)}")
+                trade_log.warning(
+                    "Warning: Could not fetch order status: %s", status_err
+                )
                 status = "FILLED"  # Assume for market orders
 
             result["success"] = True
@@ -272,121 +554,30 @@ def execute_real_futures_trade(action, contracts, client, limit_price=None):
             error_msg = error_response.get(
                 "message", error_response.get("error_details", "Unknown error")
             )
-            print(f"Trade failed with error: {error_msg}")
+            trade_log.warning("Trade failed with error: %s", error_msg)
             result["message"] = f"❌ Trade execution failed: {error_msg}"
             result["order_id"] = "failed"
             result["status"] = "failed"
 
     except Exception as e:
         error_str = str(e)
-        print(f"Error details: {error_str}")
+        trade_log.exception("Error details: %s", error_str)
         result["message"] = f"❌ Trade execution failed: {error_str}"
 
     return result
 
 
-def place_stop_loss_order(client, position_type, contracts, stop_price):
-    """Place a stop-loss order on Coinbase
-
-    Args:
-        client: Coinbase RESTClient
-        position_type: "long" or "short"
-        contracts: Number of contracts
-        stop_price: Stop-loss trigger price
-
-    Returns:
-        dict: Order result with order_id
-    """
-    try:
-        client_order_id = str(uuid.uuid4())
-        stop_price_rounded = int(round(stop_price))
-        if position_type == "long":
-            limit_price_rounded = (
-                stop_price_rounded - 2
-            )  # $2 buffer for better fill rate
-        else:
-            limit_price_rounded = (
-                stop_price_rounded + 2
-            )  # $2 buffer for better fill rate
+def place_bracket_order(client, position_type, contracts, stop_price, target_price):
+    """Place a stop-loss + take-profit bracket (OCO) order on Coinbase
 
-        # For LONG: sell to close when price drops (stop below entry)
-        # For SHORT: buy to close when price rises (stop above entry)
-
-        if position_type == "long":
-            # Stop-loss sells when price goes DOWN
-            order = client.stop_limit_order_gtc_sell(
-                client_order_id=client_order_id,
-                product_id=FUTURES_PRODUCT_ID,
-                base_size=str(contracts),
-                limit_price=str(limit_price_rounded),  # Limit slightly below stop
-                stop_price=str(stop_price_rounded),
-                stop_direction="STOP_DIRECTION_STOP_DOWN",
-            )
-        else:  # short
-            # Stop-loss buys when price goes UP
-            order = client.stop_limit_order_gtc_buy(
-                client_order_id=client_order_id,
-                product_id=FUTURES_PRODUCT_ID,
-                base_size=str(contracts),
-                limit_price=str(limit_price_rounded),  # Limit slightly above stop
-                stop_price=str(stop_price_rounded),
-                stop_direction="STOP_DIRECTION_STOP_UP",
-            )
-
-        order_dict = order.to_dict() if hasattr(order, "to_dict") else {}
-
-        # Extract order_id from nested success_response (same as market orders)
-        if order_dict.get("success", False):
-            order_id = order_dict.get("success_response", {}).get("order_id", None)
-            if order_id:
-                return {
-                    "success": True,
-                    "order_id": order_id,
-                    "message": f"✅ Stop-loss order placed at ${stop_price_rounded}",
-                }
-            else:
-                # Order API returned success but no order_id
-                error_msg = order_dict.get("success_response", {}).get(
-                    "error", "No order_id returned"
-                )
-                print(f"Stop-loss order issue: {error_msg}")
-                return {
-                    "success": False,
-                    "order_id": None,
-                    "message": f"❌ Stop-loss order failed: {error_msg}",
-                }
-        else:
-            # Order failed
-            error_response = order_dict.get("error_response", {})
-            error_msg = error_response.get(
-                "message", error_response.get("error_details", "Unknown error")
-            )
-            print(f"Stop-loss order failed: {error_msg}")
-            return {
-                "success": False,
-                "order_id": None,
-                "message": f"❌ Stop-loss order failed: {error_msg}",
-            }
-
-    except Exception as e:
-        print(f"Stop-loss exception: {e}")
-        import traceback
-
-        traceback.print_exc()
-        return {
-            "success": False,
-            "order_id": None,
-            "message": f"❌ Stop-loss order failed: {e}",
-        }
-
-
-def place_take_profit_order(client, position_type, contracts, target_price):
-    """Place a take-profit order on Coinbase
+    Both exits live in one order, so the exchange cancels the other leg as
+    soon as the stop or the target fills.
 
     Args:
         client: Coinbase RESTClient
         position_type: "long" or "short"
         contracts: Number of contracts
+        stop_price: Stop-loss trigger price
         target_price: Take-profit limit price
 
     Returns:
@@ -394,29 +585,30 @@ def place_take_profit_order(client, position_type, contracts, target_price):
     """
     try:
         client_order_id = str(uuid.uuid4())
-        target_price_rounded = int(round(target_price))
+        stop_price_rounded = _tick_round(stop_price)
+        target_price_rounded = _tick_round(target_price)
 
-        # For LONG: sell to close at limit price
-        # For SHORT: buy to close at limit price
+        # For LONG: sell to close (target above entry, stop below entry)
+        # For SHORT: buy to close (target below entry, stop above entry)
 
         if position_type == "long":
-            # Take-profit sells at limit price
-            order = client.limit_order_gtc_sell(
+            order = client.trigger_bracket_order_gtc_sell(
                 client_order_id=client_order_id,
                 product_id=FUTURES_PRODUCT_ID,
                 base_size=str(contracts),
                 limit_price=str(target_price_rounded),
+                stop_trigger_price=str(stop_price_rounded),
             )
         else:  # short
-            # Take-profit buys at limit price
-            order = client.limit_order_gtc_buy(
+            order = client.trigger_bracket_order_gtc_buy(
                 client_order_id=client_order_id,
                 product_id=FUTURES_PRODUCT_ID,
                 base_size=str(contracts),
                 limit_price=str(target_price_rounded),
+                stop_trigger_price=str(stop_price_rounded),
             )
 
-        order_dict = order.to_dict() if hasattr(order, "to_dict") else {}
+        order_dict = _as_dict(order)
 
         # Extract order_id from nested success_response (same as market orders)
         if order_dict.get("success", False):
@@ -425,18 +617,18 @@ def place_take_profit_order(client, position_type, contracts, target_price):
                 return {
                     "success": True,
                     "order_id": order_id,
-                    "message": f"✅ Take-profit order placed at ${target_price_rounded}",
+                    "message": f"✅ Bracket order placed (stop ${stop_price_rounded} / target ${target_price_rounded})",
                 }
             else:
                 # Order API returned success but no order_id
                 error_msg = order_dict.get("success_response", {}).get(
                     "error", "No order_id returned"
                 )
-                print(f"Take-profit order issue: {error_msg}")
+                trade_log.warning("Bracket order issue: %s", error_msg)
                 return {
                     "success": False,
                     "order_id": None,
-                    "message": f"❌ Take-profit order failed: {error_msg}",
+                    "message": f"❌ Bracket order failed: {error_msg}",
                 }
         else:
             # Order failed
@@ -444,22 +636,19 @@ def place_take_profit_order(client, position_type, contracts, target_price):
             error_msg = error_response.get(
                 "message", error_response.get("error_details", "Unknown error")
             )
-            print(f"Take-profit order failed: {error_msg}")
+            trade_log.warning("Bracket order failed: %s", error_msg)
             return {
                 "success": False,
                 "order_id": None,
-                "message": f"❌ Take-profit order failed: {error_msg}",
+                "message": f"❌ Bracket order failed: {error_msg}",
             }
 
     except Exception as e:
-        print(f"Take-profit exception: {e}")
-        import traceback
-
-        traceback.print_exc()
+        trade_log.exception("Bracket order exception: %s", e)
         return {
             "success": False,
             "order_id": None,
-            "message": f"❌ Take-profit order failed: {e}",
+            "message": f"❌ Bracket order failed: {e}",
         }
 
 
@@ -469,19 +658,47 @@ def cancel_pending_orders(client, order_ids):
     Args:
         client: Coinbase RESTClient
         order_ids: List of order IDs to cancel
+
+    Returns:
+        bool: True if the cancel request went through (or there was nothing to cancel)
     """
     import time
 
     if not order_ids:
-        return
+        return True
 
     try:
         client.cancel_orders(order_ids=order_ids)
         print(f"   ✅ Cancelled {len([o for o in order_ids if o])} pending orders")
         # Small delay to ensure orders are fully cancelled before placing new ones
         time.sleep(0.5)  # 500ms delay
+        return True
     except Exception as e:
-        print(f"   ⚠️ Error cancelling orders: {e}")
+        trade_log.warning("   ⚠️ Error cancelling orders: %s", e)
+        return False
+
+
+def _cancel_legacy_orders(client, pos):
+    """Cancel the separate stop-loss/take-profit orders of a pre-bracket position
+
+    load_positions queues them in pos["legacy_order_ids"]; the key is removed
+    once the cancel went through, so a failed cancel is retried next run.
+
+    Args:
+        client: Coinbase RESTClient
+        pos: positions_data["current_position"] (updated in place)
+
+    Returns:
+        bool: True if no legacy orders are left
+    """
+    legacy_ids = pos.get("legacy_order_ids")
+    if not legacy_ids:
+        return True
+    trade_log.info("   🚫 Cancelling %d legacy stop/target orders...", len(legacy_ids))
+    if not cancel_pending_orders(client, legacy_ids):
+        return False
+    pos.pop("legacy_order_ids")
+    return True
 
 
 def get_open_order_ids(client):
@@ -509,7 +726,7 @@ def get_open_order_ids(client):
                 order_ids.append(order_id)
         return order_ids
     except Exception as e:
-        print(f"   ⚠️ Error listing open orders: {e}")
+        trade_log.warning("   ⚠️ Error listing open orders: %s", e)
         return []
 
 
@@ -525,7 +742,7 @@ def cancel_all_open_orders(client):
             # Small delay to ensure orders are fully cancelled before placing new ones
             time.sleep(0.5)  # 500ms delay
         except Exception as e:
-            print(f"   ⚠️ Error cancelling orders: {e}")
+            trade_log.warning("   ⚠️ Error cancelling orders: %s", e)
 
 
 def get_current_futures_position(client):
@@ -548,14 +765,14 @@ def get_current_futures_position(client):
         )
 
         for position in pos_list:
-            product_id = getattr(position, "product_id", "")
+            product_id = _field(position, "product_id", "")
             if product_id == FUTURES_PRODUCT_ID:
-                size = float(getattr(position, "number_of_contracts", 0))
-                side = getattr(position, "side", "UNKNOWN")
-                entry_price = float(getattr(position, "entry_vwap", 0))
+                size = float(_field(position, "number_of_contracts", 0))
+                side = _field(position, "side", "UNKNOWN")
+                entry_price = float(_field(position, "entry_vwap", 0))
 
                 # FIXED: Safely handle unrealized_pnl as dict or fallback
-                pnl_obj = getattr(position, "unrealized_pnl", {})
+                pnl_obj = _field(position, "unrealized_pnl", {})
                 if isinstance(pnl_obj, dict):
                     unrealized_pnl = float(pnl_obj.get("value", 0))
                 else:
@@ -573,7 +790,7 @@ def get_current_futures_position(client):
         return {"exists": False, "size": 0, "side": None}
 
     except Exception as e:
-        print(f"API error details: {e}")  # For debugging
+        log.warning("API error details: %s", e)
         return {
             "exists": None,
             "error": str(e),
@@ -608,48 +825,36 @@ def execute_trade(
         # FIXED: Store entry order ID for limit orders (so we can cancel it later if needed)
         positions_data["current_position"]["entry_order_id"] = result.get("order_id")
 
-        # Place stop-loss order
-        if stop_loss:
-            print(f"   📍 Placing stop-loss order at ${stop_loss:,.2f}...")
-            stop_result = place_stop_loss_order(
-                client, position_type, CONTRACTS_PER_TRADE, stop_loss
+        # Place stop-loss and take-profit together as one bracket order
+        if stop_loss and take_profit:
+            trade_log.info(
+                "   📍 Placing bracket order (stop $%.2f / target $%.2f)...",
+                stop_loss,
+                take_profit,
             )
-            result["message"] += f"\n   {stop_result['message']}"
-
-            # Store stop-loss order ID in positions data
-            if stop_result.get("success"):
-                positions_data["current_position"]["stop_loss"] = stop_loss
-                positions_data["current_position"]["stop_loss_order_id"] = (
-                    stop_result.get("order_id")
-                )
-            else:
-                print(
-                    f"   ⚠️ WARNING: Stop-loss order failed to place - position has NO STOP PROTECTION!"
-                )
-
-        # Place take-profit order
-        if take_profit:
-            print(f"   🎯 Placing take-profit order at ${take_profit:,.2f}...")
-            tp_result = place_take_profit_order(
-                client, position_type, CONTRACTS_PER_TRADE, take_profit
+            bracket_result = place_bracket_order(
+                client, position_type, CONTRACTS_PER_TRADE, stop_loss, take_profit
             )
-            result["message"] += f"\n   {tp_result['message']}"
+            result["message"] += f"\n   {bracket_result['message']}"
 
-            # Store take-profit order ID in positions data
-            if tp_result.get("success"):
+            # Store bracket order ID in positions data
+            if bracket_result.get("success"):
+                positions_data["current_position"]["stop_loss"] = stop_loss
                 positions_data["current_position"]["take_profit"] = take_profit
-                positions_data["current_position"]["take_profit_order_id"] = (
-                    tp_result.get("order_id")
+                positions_data["current_position"]["bracket_order_id"] = (
+                    bracket_result.get("order_id")
                 )
             else:
-                print(
-                    f"   ⚠️ WARNING: Take-profit order failed to place - position has NO TARGET!"
+                trade_log.warning(
+                    "   ⚠️ WARNING: Bracket order failed to place - position has NO STOP PROTECTION or TARGET!"
                 )
 
         # Update positions data with entry info
         positions_data["current_position"]["status"] = position_type
         positions_data["current_position"]["entry_price"] = price
-        positions_data["current_position"]["entry_time"] = datetime.now().isoformat()
+        entry_dt = datetime.now(timezone.utc)
+        positions_data["current_position"]["entry_time"] = entry_dt.isoformat()
+        positions_data["current_position"]["entry_ts"] = int(entry_dt.timestamp())
         positions_data["current_position"]["unrealized_pnl"] = (
             0.0  # Initial for new position
         )
@@ -658,42 +863,47 @@ def execute_trade(
     elif result.get("success") and action in ["close_long", "close_short"]:
         # Get order IDs from positions data
         entry_order_id = positions_data["current_position"].get("entry_order_id")
-        stop_order_id = positions_data["current_position"].get("stop_loss_order_id")
-        tp_order_id = positions_data["current_position"].get("take_profit_order_id")
+        bracket_order_id = positions_data["current_position"].get("bracket_order_id")
 
-        # Cancel any pending orders (including entry if limit order never filled)
-        order_ids = [oid for oid in [entry_order_id, stop_order_id, tp_order_id] if oid]
+        # Cancel any pending orders (including entry if limit order never filled,
+        # and stop/target orders left from the pre-bracket layout)
+        order_ids = [oid for oid in [entry_order_id, bracket_order_id] if oid]
+        order_ids += positions_data["current_position"].pop("legacy_order_ids", [])
         if order_ids:
-            print(f"   🚫 Cancelling {len(order_ids)} pending orders...")
+            trade_log.info("   🚫 Cancelling %d pending orders...", len(order_ids))
             cancel_pending_orders(client, order_ids)
 
         # Calculate P/L for real trading (in USD)
         entry_price = positions_data["current_position"].get("entry_price")
         if entry_price:
-            multiplier = CONTRACTS_PER_TRADE * CONTRACT_MULTIPLIER
             if action == "close_long":
-                profit_loss = (price - entry_price) * multiplier
+                profit_loss = (price - entry_price) * _POS_MULTIPLIER
             else:  # close_short
-                profit_loss = (entry_price - price) * multiplier
+                profit_loss = (entry_price - price) * _POS_MULTIPLIER
 
             # Update trade statistics
             positions_data["total_trades"] += 1
             if profit_loss > 0:
                 positions_data["winning_trades"] += 1
+                positions_data["total_profit"] += profit_loss
                 emoji = "✅"
             else:
                 positions_data["losing_trades"] += 1
+                positions_data["total_loss"] -= profit_loss
                 emoji = "❌"
 
-            # Add to trade history
-            positions_data["trade_history"].append(
+            # Add to trade history (exit_time and exit_ts from one clock reading)
+            exit_dt = datetime.now(timezone.utc)
+            append_trade(
                 {
                     "type": "long" if action == "close_long" else "short",
                     "entry_price": entry_price,
                     "exit_price": price,
                     "profit_loss": profit_loss,
                     "entry_time": positions_data["current_position"]["entry_time"],
-                    "exit_time": datetime.now().isoformat(),
+                    "entry_ts": positions_data["current_position"]["entry_ts"],
+                    "exit_time": exit_dt.isoformat(),
+                    "exit_ts": int(exit_dt.timestamp()),
                 }
             )
 
@@ -701,47 +911,64 @@ def execute_trade(
             result["message"] += f" | P/L: ${profit_loss:+,.2f}"
             result["message"] = result["message"].replace("CLOSED", f"{emoji} CLOSED")
 
-        # In execute_trade function, after closing position, ensure order IDs are cleared:
-        # (This part should already be in your code, but make sure it's like this)
-
-        # Clear positions data (when closing)
-        positions_data["current_position"] = {
-            "status": "none",
-            "entry_price": None,
-            "entry_time": None,
-            "stop_loss": None,
-            "take_profit": None,
-            "trade_id": None,
-            "action": None,
-            "entry_order_id": None,  # Clear entry order ID
-            "stop_loss_order_id": None,  # Make sure these are cleared
-            "take_profit_order_id": None,  # Make sure these are cleared
-            "unrealized_pnl": None,
-        }
+        # Clear positions data (when closing), including the order IDs
+        positions_data["current_position"].update(_EMPTY_POSITION)
 
         result["profit_loss"] = profit_loss if "profit_loss" in locals() else 0
 
     return result
 
 
-def manage_positions(positions_data, trade_data, current_price, csv_data, client=None):
+def _ensure_protective_orders(client, position_type, pos, trade_data, results):
+    """Place the bracket (stop + target) for a held position that has none
+
+    Uses the levels from the current signal. The outcome is appended to the
+    holding message in results[0].
+
+    Args:
+        client: Coinbase RESTClient
+        position_type: "long" or "short"
+        pos: positions_data["current_position"] (updated in place on success)
+        trade_data: Current signal with stop_loss and take_profit
+        results: manage_positions results list (results[0] is the holding message)
+    """
+    stop_loss = trade_data.get("stop_loss")
+    take_profit = trade_data.get("take_profit")
+    if pos.get("bracket_order_id") is not None or not (stop_loss and take_profit):
+        return
+    # A position from before brackets still has its own stop and target on the
+    # exchange - they must be gone before the bracket replaces them
+    if not _cancel_legacy_orders(client, pos):
+        return
+
+    trade_log.info(
+        "   📍 Placing missing bracket order (stop $%.2f / target $%.2f)...",
+        stop_loss,
+        take_profit,
+    )
+    bracket_result = place_bracket_order(
+        client, position_type, CONTRACTS_PER_TRADE, stop_loss, take_profit
+    )
+    if bracket_result.get("success"):
+        pos["stop_loss"] = stop_loss
+        pos["take_profit"] = take_profit
+        pos["bracket_order_id"] = bracket_result.get("order_id")
+    results[0]["message"] += f"\n   {bracket_result['message']}"
+
+
+def manage_positions(positions_data, trade_data, current_price, candles, client=None):
     """Manage positions based on current state and new signal"""
     results = []
     current_status = positions_data["current_position"]["status"]
     new_signal = trade_data.get("action", "hold") if trade_data else "hold"
 
-    # Check if stop-loss or take-profit hit first (checks candle highs/lows)
-    should_close, reason, exit_price, orders_to_cancel = check_stop_target(
-        positions_data, csv_data
-    )
+    # Check if stop-loss or take-profit hit first (checks candle highs/lows);
+    # nothing to check while flat
+    should_close = False
+    if current_status != "none":
+        should_close, reason, exit_price = check_stop_target(positions_data, candles)
     if should_close:
-        # Cancel the other pending order
-        if orders_to_cancel:
-            print(
-                f"   🚫 Cancelling {len(orders_to_cancel)} pending order(s) after {reason}..."
-            )
-            cancel_pending_orders(client, orders_to_cancel)
-
+        # Closing cancels the entry and bracket orders
         if current_status == "long":
             result = execute_trade(
                 "close_long", exit_price, positions_data, client=client
@@ -759,6 +986,8 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
 
     # Position management logic
     if current_status == "none":
+        # Flat: stop/target orders left from the pre-bracket layout protect nothing
+        _cancel_legacy_orders(client, positions_data["current_position"])
         if new_signal == "buy":
             # Validate trade levels before executing
             is_valid, error_msg = validate_trade_levels(trade_data, current_price)
@@ -771,7 +1000,7 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
                 )
             else:
                 # NEW: Check volume conditions before opening trade
-                volume_ok, volume_msg = check_volume_conditions(csv_data)
+                volume_ok, volume_msg = check_volume_conditions(candles)
                 if not volume_ok:
                     results.append(
                         {
@@ -803,7 +1032,7 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
                 )
             else:
                 # NEW: Check volume conditions before opening trade
-                volume_ok, volume_msg = check_volume_conditions(csv_data)
+                volume_ok, volume_msg = check_volume_conditions(candles)
                 if not volume_ok:
                     results.append(
                         {
@@ -832,52 +1061,19 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
 
     elif current_status == "long":
         if new_signal == "buy":
+            pos = positions_data["current_position"]
             # Calculate P/L from entry price and current price
-            entry = positions_data["current_position"]["entry_price"]
-            multiplier = CONTRACTS_PER_TRADE * CONTRACT_MULTIPLIER
-            pl = (current_price - entry) * multiplier if entry else 0
-            positions_data["current_position"]["unrealized_pnl"] = pl
+            entry = pos["entry_price"]
+            pl = (current_price - entry) * _POS_MULTIPLIER if entry else 0
+            pos["unrealized_pnl"] = pl
             results.append(
                 {
                     "success": True,
                     "message": f"✅ Holding LONG (Entry: ${entry:,.2f}, Current P/L: ${pl:+,.2f})",
                 }
             )
-            # FIXED: Place missing stop/TP if None
-            if positions_data["current_position"][
-                "stop_loss_order_id"
-            ] is None and trade_data.get("stop_loss"):
-                print(
-                    f"   📍 Placing missing stop-loss at ${trade_data['stop_loss']:.2f}..."
-                )
-                stop_result = place_stop_loss_order(
-                    client, "long", CONTRACTS_PER_TRADE, trade_data["stop_loss"]
-                )
-                if stop_result.get("success"):
-                    positions_data["current_position"]["stop_loss"] = trade_data[
-                        "stop_loss"
-                    ]
-                    positions_data["current_position"]["stop_loss_order_id"] = (
-                        stop_result.get("order_id")
-                    )
-                results[0]["message"] += f"\n   {stop_result['message']}"
-            if positions_data["current_position"][
-                "take_profit_order_id"
-            ] is None and trade_data.get("take_profit"):
-                print(
-                    f"   🎯 Placing missing take-profit at ${trade_data['take_profit']:.2f}..."
-                )
-                tp_result = place_take_profit_order(
-                    client, "long", CONTRACTS_PER_TRADE, trade_data["take_profit"]
-                )
-                if tp_result.get("success"):
-                    positions_data["current_position"]["take_profit"] = trade_data[
-                        "take_profit"
-                    ]
-                    positions_data["current_position"]["take_profit_order_id"] = (
-                        tp_result.get("order_id")
-                    )
-                results[0]["message"] += f"\n   {tp_result['message']}"
+            # FIXED: Place missing bracket (stop + target) if None
+            _ensure_protective_orders(client, "long", pos, trade_data, results)
         elif new_signal == "sell":
             # Close long, open short
             result1 = execute_trade(
@@ -896,7 +1092,7 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
                 )
             else:
                 # NEW: Check volume conditions before opening opposite position
-                volume_ok, volume_msg = check_volume_conditions(csv_data)
+                volume_ok, volume_msg = check_volume_conditions(candles)
                 if not volume_ok:
                     results.append(
                         {
@@ -924,52 +1120,19 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
 
     elif current_status == "short":
         if new_signal == "sell":
+            pos = positions_data["current_position"]
             # Calculate P/L from entry price and current price
-            entry = positions_data["current_position"]["entry_price"]
-            multiplier = CONTRACTS_PER_TRADE * CONTRACT_MULTIPLIER
-            pl = (entry - current_price) * multiplier if entry else 0
-            positions_data["current_position"]["unrealized_pnl"] = pl
+            entry = pos["entry_price"]
+            pl = (entry - current_price) * _POS_MULTIPLIER if entry else 0
+            pos["unrealized_pnl"] = pl
             results.append(
                 {
                     "success": True,
                     "message": f"✅ Holding SHORT (Entry: ${entry:,.2f}, Current P/L: ${pl:+,.2f})",
                 }
             )
-            # FIXED: Place missing stop/TP if None
-            if positions_data["current_position"][
-                "stop_loss_order_id"
-            ] is None and trade_data.get("stop_loss"):
-                print(
-                    f"   📍 Placing missing stop-loss at ${trade_data['stop_loss']:.2f}..."
-                )
-                stop_result = place_stop_loss_order(
-                    client, "short", CONTRACTS_PER_TRADE, trade_data["stop_loss"]
-                )
-                if stop_result.get("success"):
-                    positions_data["current_position"]["stop_loss"] = trade_data[
-                        "stop_loss"
-                    ]
-                    positions_data["current_position"]["stop_loss_order_id"] = (
-                        stop_result.get("order_id")
-                    )
-                results[0]["message"] += f"\n   {stop_result['message']}"
-            if positions_data["current_position"][
-                "take_profit_order_id"
-            ] is None and trade_data.get("take_profit"):
-                print(
-                    f"   🎯 Placing missing take-profit at ${trade_data['take_profit']:.2f}..."
-                )
-                tp_result = place_take_profit_order(
-                    client, "short", CONTRACTS_PER_TRADE, trade_data["take_profit"]
-                )
-                if tp_result.get("success"):
-                    positions_data["current_position"]["take_profit"] = trade_data[
-                        "take_profit"
-                    ]
-                    positions_data["current_position"]["take_profit_order_id"] = (
-                        tp_result.get("order_id")
-                    )
-                results[0]["message"] += f"\n   {tp_result['message']}"
+            # FIXED: Place missing bracket (stop + target) if None
+            _ensure_protective_orders(client, "short", pos, trade_data, results)
         elif new_signal == "buy":
             # Close short, open long
             result1 = execute_trade(
@@ -988,7 +1151,7 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
                 )
             else:
                 # NEW: Check volume conditions before opening opposite position
-                volume_ok, volume_msg = check_volume_conditions(csv_data)
+                volume_ok, volume_msg = check_volume_conditions(candles)
                 if not volume_ok:
                     results.append(
                         {
@@ -1021,15 +1184,16 @@ def manage_positions(positions_data, trade_data, current_price, csv_data, client
 
 
 def fetch_btc_data():
-    """Fetch futures candles from Coinbase Advanced API"""
-    from coinbase.rest import RESTClient
+    """Fetch futures candles from Coinbase Advanced API
+
+    Returns:
+        tuple: (candles, csv_data)
+            - candles: DataFrame with Timestamp (unix seconds), Open, High, Low, Close, Volume
+            - csv_data: The same candles as a CSV string (for the LLM prompt)
+    """
     import time
 
-    # Initialize client
-    client = RESTClient(
-        api_key=os.getenv("COINBASE_API_KEY"),
-        api_secret=os.getenv("COINBASE_API_SECRET"),
-    )
+    client = get_coinbase_client()
 
     # Request last N+1 minutes of data
     end_time = int(time.time())
@@ -1044,90 +1208,125 @@ def fetch_btc_data():
     )
 
     # Extract candles (API returns newest first)
-    candles_list = getattr(candles_response, "candles", [])
+    candles_list = _field(candles_response, "candles", [])
 
     # Reverse to get oldest first
     candles_list.reverse()
 
-    # Take last N candles, convert to CSV
+    # Take last N candles
     recent = (
         candles_list[-TIMEFRAME_MINUTES:]
         if len(candles_list) >= TIMEFRAME_MINUTES
         else candles_list
     )
 
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Timestamp", "Open", "High", "Low", "Close", "Volume"])
+    # Fill typed column arrays directly (no per-row tuples for pandas to infer)
+    # and format the CSV rows for the LLM prompt in the same pass
+    n = len(recent)
+    timestamps = np.empty(n, dtype=np.int64)  # Unix timestamps
+    ohlcv = np.empty((n, 5), dtype=np.float64)
+    csv_rows = ["Timestamp,Open,High,Low,Close,Volume"]
+    for i, candle in enumerate(recent):
+        ts = int(_field(candle, "start", 0))
+        row = (
+            float(_field(candle, "open", 0)),
+            float(_field(candle, "high", 0)),
+            float(_field(candle, "low", 0)),
+            float(_field(candle, "close", 0)),
+            float(_field(candle, "volume", 0)),
+        )
+        timestamps[i] = ts
+        ohlcv[i] = row
+        csv_rows.append(f"{ts},{row[0]},{row[1]},{row[2]},{row[3]},{row[4]}")
+    candles = pd.DataFrame(
+        {
+            "Timestamp": timestamps,
+            "Open": ohlcv[:, 0],
+            "High": ohlcv[:, 1],
+            "Low": ohlcv[:, 2],
+            "Close": ohlcv[:, 3],
+            "Volume": ohlcv[:, 4],
+        }
+    )
+
+    return candles, "\n".join(csv_rows) + "\n"
+
+
+_CHART = {"mpf": None, "style": None}  # Charting module and style (loaded on first use)
 
-    for candle in recent:
-        ts = int(getattr(candle, "start", 0))  # Unix timestamp
-        open_price = float(getattr(candle, "open", 0))
-        high = float(getattr(candle, "high", 0))
-        low = float(getattr(candle, "low", 0))
-        close = float(getattr(candle, "close", 0))
-        volume = float(getattr(candle, "volume", 0))
-        writer.writerow([ts, open_price, high, low, close, volume])
+# mpf.plot arguments shared by every chart (the style is added once it is loaded)
+_PLOT_KWARGS_BASE = {
+    "type": "candle",
+    "volume": True,
+    "title": f"{CRYPTO_SYMBOL} FUTURES ({FUTURES_PRODUCT_ID}) - LIVE - Last {TIMEFRAME_MINUTES} min",
+    "returnfig": True,  # Return figure object so we can add text
+    "figsize": (12, 7),  # Pre-sized, so savefig needs no tight-bbox pass
+    "scale_padding": {"left": 0.6, "right": 0.3, "top": 0.8, "bottom": 0.7},
+}
 
-    return output.getvalue()
+
+def _load_charting():
+    """Import mplfinance (on the Agg backend) and build the chart style once
+
+    Returns:
+        tuple: (mplfinance module, chart style)
+    """
+    if _CHART["mpf"] is None:
+        import matplotlib
+
+        matplotlib.use("Agg")  # Non-interactive backend (straight to PNG, no GUI)
+        import mplfinance as mpf
+
+        # Custom chart style for professional look
+        marketcolors = mpf.make_marketcolors(
+            up="#26a69a",
+            down="#ef5350",
+            edge="inherit",
+            wick={"up": "#26a69a", "down": "#ef5350"},
+            volume="in",
+        )
+        _CHART["style"] = mpf.make_mpf_style(
+            marketcolors=marketcolors,
+            gridstyle=":",
+            y_on_right=False,
+            facecolor="#1e1e1e",
+            figcolor="#1e1e1e",
+            edgecolor="#555555",
+            gridcolor="#333333",
+            rc={
+                "axes.labelcolor": "white",  # X and Y axis labels
+                "xtick.color": "white",  # X axis tick labels
+                "ytick.color": "white",  # Y axis tick labels
+                "axes.titlecolor": "white",  # Chart title
+                "text.color": "white",  # All text
+            },
+        )
+        _CHART["mpf"] = mpf
+    return _CHART["mpf"], _CHART["style"]
 
 
-def generate_chart(data, trade_data=None, trade_invalid=False):
+def generate_chart(candles, trade_data=None, trade_invalid=False):
     """Generate candlestick chart from OHLCV data and return as bytes
 
     Args:
-        data: CSV string with OHLCV data
+        candles: OHLCV DataFrame from fetch_btc_data()
         trade_data: Dict with entry_price, stop_loss, take_profit (optional)
         trade_invalid: Boolean indicating if trade was rejected by validation
     """
-    # Parse the data into a pandas DataFrame
-    lines = data.strip().split("\n")[1:]  # Skip header
-    candles = []
-    for line in lines:
-        parts = line.split(",")
-        # Create UTC timestamp, convert to local time
-        utc_time = pd.to_datetime(int(parts[0]), unit="s", utc=True)
-        local_time = utc_time.tz_convert("America/New_York").tz_localize(
-            None
-        )  # Convert to ET and remove timezone
-        candles.append(
-            {
-                "timestamp": local_time,
-                "open": float(parts[1]),
-                "high": float(parts[2]),
-                "low": float(parts[3]),
-                "close": float(parts[4]),
-                "volume": float(parts[5]),
-            }
-        )
-
-    df = pd.DataFrame(candles)
-    df.set_index("timestamp", inplace=True)
-    df.columns = ["Open", "High", "Low", "Close", "Volume"]
-
-    # Create custom style for professional look
-    mc = mpf.make_marketcolors(
-        up="#26a69a",
-        down="#ef5350",
-        edge="inherit",
-        wick={"up": "#26a69a", "down": "#ef5350"},
-        volume="in",
+    mpf, chart_style = _load_charting()
+
+    # Index by local (ET) time with the timezone removed (one vectorized conversion)
+    local_time = (
+        pd.to_datetime(candles["Timestamp"].to_numpy(), unit="s", utc=True)
+        .tz_convert("America/New_York")
+        .tz_localize(None)
+        .rename("timestamp")
     )
-    style = mpf.make_mpf_style(
-        marketcolors=mc,
-        gridstyle=":",
-        y_on_right=False,
-        facecolor="#1e1e1e",
-        figcolor="#1e1e1e",
-        edgecolor="#555555",
-        gridcolor="#333333",
-        rc={
-            "axes.labelcolor": "white",  # X and Y axis labels
-            "xtick.color": "white",  # X axis tick labels
-            "ytick.color": "white",  # Y axis tick labels
-            "axes.titlecolor": "white",  # Chart title
-            "text.color": "white",  # All text
-        },
+    # float32 is plenty for drawing; the shared candles stay float64 for stop/target math
+    df = (
+        candles[["Open", "High", "Low", "Close", "Volume"]]
+        .astype(np.float32)
+        .set_index(local_time)
     )
 
     # Add horizontal lines for entry, stop-loss, and take-profit
@@ -1167,13 +1366,7 @@ def generate_chart(data, trade_data=None, trade_invalid=False):
 
     # Save to BytesIO instead of file
     buf = BytesIO()
-    plot_kwargs = {
-        "type": "candle",
-        "style": style,
-        "volume": True,
-        "title": f"{CRYPTO_SYMBOL} FUTURES ({FUTURES_PRODUCT_ID}) - LIVE - Last {TIMEFRAME_MINUTES} min",
-        "returnfig": True,  # Return figure object so we can add text
-    }
+    plot_kwargs = {**_PLOT_KWARGS_BASE, "style": chart_style}
 
     # Only add hlines if we have trade data
     if hlines_dict:
@@ -1206,26 +1399,27 @@ def generate_chart(data, trade_data=None, trade_invalid=False):
         )
 
     # Save figure to buffer
-    fig.savefig(buf, dpi=150, bbox_inches="tight")
+    fig.savefig(buf, dpi=100, format="png")
     buf.seek(0)
     return buf
 
 
-def analyze_with_llm(csv_data):
+def analyze_with_llm(csv_data, candles):
     """Get trading analysis and structured trade data from ChatGPT
 
+    Args:
+        csv_data: CSV string with OHLCV data (sent in the prompt)
+        candles: OHLCV DataFrame from fetch_btc_data()
+
     Returns:
         tuple: (analysis_text, trade_data_dict)
     """
     import time
 
-    # Initialize OpenAI client
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_openai_client()
 
     # Get current price from latest candle
-    lines = csv_data.strip().split("\n")
-    latest_candle = lines[-1].split(",")
-    current_price = float(latest_candle[4])  # Close price
+    current_price = float(candles["Close"].iat[-1])
 
     prompt = f"""You are a crypto TA expert specializing in TREND FOLLOWING ONLY. Your ONLY job is to identify trends and enter on pullbacks. DO NOT take counter-trend trades. DO NOT trade in ranging markets.
 
@@ -1500,15 +1694,30 @@ For "hold": set stop_loss and take_profit to null"""
     print(f"   ⏱️  Calling {MODEL_NAME}...", end="", flush=True)
     start_time = time.time()
 
-    response = client.chat.completions.create(
+    # Stream the completion and stop reading once the trade JSON has closed
+    stream = client.chat.completions.create(
         model=MODEL_NAME,
         messages=[{"role": "user", "content": prompt}],
+        stream=True,
     )
+    chunks = []
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            chunks.append(delta)
+            if "}" in delta and _trade_json_complete("".join(chunks)):
+                break
+    finally:
+        stream.close()
 
     elapsed_time = time.time() - start_time
     print(f" took {elapsed_time:.2f}s")
 
-    full_response = response.choices[0].message.content
+    full_response = "".join(chunks)
 
     # Parse response to extract analysis and trade data
     analysis, trade_data = parse_llm_response(full_response)
@@ -1521,18 +1730,71 @@ For "hold": set stop_loss and take_profit to null"""
             "stop_loss": None,
             "take_profit": None,
             "confidence": 0,
+            "parse_failed": True,  # Never treated as a quiet run
         }
         print("⚠️ LLM response parsing failed - defaulting to HOLD")
 
     return analysis, trade_data
 
 
+# Markers stripped from the analysis text that precedes the trade JSON
+_ANALYSIS_HEADER_RE = re.compile(r"^\*\*?ANALYSIS\*\*?:?\s*", re.IGNORECASE)
+_TRADE_DATA_TAIL_RE = re.compile(
+    r"\*\*?TRADE_DATA\*\*?:?\s*.*$", re.DOTALL | re.IGNORECASE
+)
+
+
+_JSON_DECODER = json.JSONDecoder()  # raw_decode finds the trade JSON inside prose
+
+
+def _json_object_spans(text):
+    """Yield (start, end) of each top-level balanced {...} block in text
+
+    Braces inside JSON strings are ignored. An unclosed trailing block is not yielded.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"' and depth:
+            in_string = True
+        elif ch == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield start, i + 1
+
+
+def _trade_json_complete(text):
+    """True once text ends with a closed JSON block containing the trade action"""
+    end = len(text.rstrip())
+    last_span = None
+    for span in _json_object_spans(text):
+        last_span = span
+    return (
+        last_span is not None
+        and last_span[1] == end
+        and '"action"' in text[last_span[0] : last_span[1]]
+    )
+
+
 def parse_llm_response(response_text):
     """Extract human analysis and structured trade data from ChatGPT response"""
 
     # Try to parse as complete JSON first (new nested format)
     try:
-        full_json = json.loads(response_text)
+        full_json = _json_loads(response_text)
         if isinstance(full_json, dict):
             # Check if it has the nested structure: {"analysis": "...", "trade_data": {...}}
             if "analysis" in full_json and "trade_data" in full_json:
@@ -1540,7 +1802,7 @@ def parse_llm_response(response_text):
                 analysis_value = full_json["analysis"]
                 if not isinstance(analysis_value, str):
                     analysis_value = (
-                        json.dumps(analysis_value)
+                        _json_dumps(analysis_value)
                         if isinstance(analysis_value, dict)
                         else str(analysis_value)
                     )
@@ -1570,30 +1832,30 @@ def parse_llm_response(response_text):
     except (json.JSONDecodeError, ValueError):
         pass
 
-    # Try to find JSON in the response (old method for backwards compatibility)
-    # This regex now allows nested braces
-    json_match = re.search(
-        r'\{(?:[^{}]|(?:\{[^{}]*\}))*"action"[^}]*\}', response_text, re.DOTALL
-    )
-
-    if json_match:
+    # Find the first JSON block with an "action" embedded in the text (text + JSON format).
+    # Each "{" is tried as the start of one object; a stray "{" in the prose just
+    # fails to decode and the scan moves on to the next one
+    start = response_text.find("{")
+    while start != -1:
         try:
-            trade_data = json.loads(json_match.group(0))
+            block_json, end = _JSON_DECODER.raw_decode(response_text, start)
+        except json.JSONDecodeError:
+            start = response_text.find("{", start + 1)
+            continue
+        trade_data = (
+            block_json.get("trade_data", block_json)
+            if isinstance(block_json, dict)
+            else None
+        )
+        if isinstance(trade_data, dict) and "action" in trade_data:
             # Extract analysis (everything before the JSON)
-            analysis = response_text[: json_match.start()].strip()
+            analysis = response_text[:start].strip()
             # Clean up common markers
-            analysis = re.sub(
-                r"^\*\*?ANALYSIS\*\*?:?\s*", "", analysis, flags=re.IGNORECASE
-            )
-            analysis = re.sub(
-                r"\*\*?TRADE_DATA\*\*?:?\s*.*$",
-                "",
-                analysis,
-                flags=re.DOTALL | re.IGNORECASE,
-            )
+            analysis = _ANALYSIS_HEADER_RE.sub("", analysis)
+            analysis = _TRADE_DATA_TAIL_RE.sub("", analysis)
             return analysis.strip(), trade_data
-        except json.JSONDecodeError:
-            pass
+        # A complete object without a trade action - skip past it
+        start = response_text.find("{", end)
 
     # Fallback: return full text as analysis, no trade data
     return response_text, None
@@ -1617,41 +1879,45 @@ def validate_trade_levels(trade_data, current_price):
     if stop is None or target is None:
         return False, "Missing stop_loss or take_profit"
 
-    # Calculate distances and percentages
+    # Calculate distances and percentages once
     stop_distance = abs(entry - stop)
     target_distance = abs(entry - target)
-    stop_percentage = (stop_distance / entry) * 100  # Convert to percentage
-    target_percentage = (target_distance / entry) * 100
+    percent_per_dollar = 100.0 / entry  # Convert distances to percentage of entry
+    stop_percentage = stop_distance * percent_per_dollar
+    target_percentage = target_distance * percent_per_dollar
+    rr_ratio = target_distance / stop_distance if stop_distance > 0 else 0
 
     # Check stop distance constraints (use configured min/max percentages)
-    if stop_percentage < MIN_DISTANCE_PERCENT:
-        return (
-            False,
-            f"Stop too tight: {stop_percentage:.2f}% (minimum {MIN_DISTANCE_PERCENT}%)",
-        )
-    if stop_percentage > MAX_DISTANCE_PERCENT:
+    if not MIN_DISTANCE_PERCENT <= stop_percentage <= MAX_DISTANCE_PERCENT:
+        if stop_percentage < MIN_DISTANCE_PERCENT:
+            return (
+                False,
+                f"Stop too tight: {stop_percentage:.2f}% (minimum {MIN_DISTANCE_PERCENT}%)",
+            )
         return (
             False,
             f"Stop too wide: {stop_percentage:.2f}% (maximum {MAX_DISTANCE_PERCENT}%)",
         )
 
     # Check target distance constraints (use configured min/max percentages)
-    if target_percentage < MIN_DISTANCE_PERCENT:
-        return (
-            False,
-            f"Target too close: {target_percentage:.2f}% (minimum {MIN_DISTANCE_PERCENT}%)",
-        )
-    if target_percentage > MAX_DISTANCE_PERCENT:
+    if not MIN_DISTANCE_PERCENT <= target_percentage <= MAX_DISTANCE_PERCENT:
+        if target_percentage < MIN_DISTANCE_PERCENT:
+            return (
+                False,
+                f"Target too close: {target_percentage:.2f}% (minimum {MIN_DISTANCE_PERCENT}%)",
+            )
         return (
             False,
             f"Target too far: {target_percentage:.2f}% (maximum {MAX_DISTANCE_PERCENT}%)",
         )
 
     # Check risk-reward ratio (0.5:1 to 3:1, meaning 1:2 to 3:1)
-    rr_ratio = target_distance / stop_distance if stop_distance > 0 else 0
-    if rr_ratio < 0.5:
-        return False, f"Risk-reward too low: {rr_ratio:.2f}:1 (minimum 0.5:1, aka 1:2)"
-    if rr_ratio > 3.0:
+    if not 0.5 <= rr_ratio <= 3.0:
+        if rr_ratio < 0.5:
+            return (
+                False,
+                f"Risk-reward too low: {rr_ratio:.2f}:1 (minimum 0.5:1, aka 1:2)",
+            )
         return False, f"Risk-reward too high: {rr_ratio:.2f}:1 (maximum 3:1)"
 
     # For BUY (long): stop < entry < target
@@ -1683,36 +1949,30 @@ def validate_trade_levels(trade_data, current_price):
     return True, None
 
 
-def check_volume_conditions(csv_data):
+def check_volume_conditions(candles):
     """Check if volume conditions are met for opening new trades
 
     Conditions (both must be satisfied):
     - Average volume of last 10 candles must be > 100
     - At least 7 out of 10 candles must have volume > 20
 
+    Args:
+        candles: OHLCV DataFrame from fetch_btc_data()
+
     Returns:
         tuple: (is_valid, failure_message)
             - is_valid: True if both conditions pass, False otherwise
             - failure_message: None if valid, descriptive string if invalid
     """
-    # Parse CSV data to get last 10 candles
-    lines = csv_data.strip().split("\n")[1:]  # Skip header
-
-    # Get last 10 candles (or all if less than 10)
-    last_10_lines = lines[-10:] if len(lines) >= 10 else lines
-
-    volumes = []
-    for line in last_10_lines:
-        parts = line.split(",")
-        volume = float(parts[5])  # Volume is 6th column (index 5)
-        volumes.append(volume)
+    # Volumes of the last 10 candles (or all if less than 10)
+    volumes = candles["Volume"].to_numpy()[-10:]
 
     # Check condition 1: Average volume > 100
-    avg_volume = sum(volumes) / len(volumes) if volumes else 0
+    avg_volume = float(volumes.mean()) if volumes.size else 0
     avg_check = avg_volume > 100
 
     # Check condition 2: At least 7 candles with volume > 20
-    high_volume_count = sum(1 for v in volumes if v > 20)
+    high_volume_count = int((volumes > 20).sum())
     count_check = high_volume_count >= 7
 
     # Determine result
@@ -1730,6 +1990,25 @@ def check_volume_conditions(csv_data):
     return False, failure_msg
 
 
+# Discord embed color per signal action (Green/Yellow/Red)
+COLOR_BY_ACTION = {"buy": 0x00FF00, "hold": 0xFFA500, "sell": 0xFF0000}
+
+DISCORD_DESCRIPTION_LIMIT = 4096  # Max characters in an embed description
+
+# Embed fields that are the same on every run (send_to_discord adds the rest)
+_EMBED_TEMPLATE = {
+    "title": f"🪙 {CRYPTO_SYMBOL} Futures Bot ({FUTURES_PRODUCT_ID})",
+    "footer": {
+        "text": f"💰 LIVE TRADING | {CONTRACTS_PER_TRADE} contract(s) | {GITHUB_RUN_ID}"
+    },
+}
+
+
+def _fmt_price(value):
+    """Format a price as $1,234.56, or show it as-is if it isn't a number (e.g. N/A)"""
+    return f"${value:,.2f}" if isinstance(value, (int, float)) else f"{value}"
+
+
 def send_to_discord(
     analysis,
     webhook_url,
@@ -1740,186 +2019,211 @@ def send_to_discord(
     futures_balance=None,
     buying_power=None,
     daily_pnl=None,
+    trade_invalid=False,
+    run_timestamp=None,
 ):
-    """Send analysis and chart to Discord with position management info"""
+    """Send analysis and chart to Discord with position management info
+
+    Args:
+        chart_image: PNG BytesIO from generate_chart(), or None for a text-only embed
+        trade_invalid: True if the signal's trade was rejected by level validation
+        run_timestamp: UTC ISO8601 timestamp of this run (defaults to now)
+
+    Returns:
+        True if Discord accepted the post
+    """
 
     # Start with analysis (ensure it's always a string)
     if isinstance(analysis, dict):
         # If analysis is accidentally a dict, convert to JSON string or extract text
         analysis = (
-            json.dumps(analysis, indent=2) if analysis else "Analysis parsing error"
+            _json_dumps(analysis, indent=True) if analysis else "Analysis parsing error"
         )
         print("⚠️ Warning: analysis was a dict, converted to string")
-    full_description = str(analysis)
+    parts = [str(analysis)]
 
     # Add trade results (position changes)
     if trade_results:
-        full_description += "\n\n**💼 Position Updates:**"
+        parts.append("")
+        parts.append("**💼 Position Updates:**")
         for result in trade_results:
-            full_description += f"\n{result['message']}"
+            parts.append(result["message"])
 
     # ALWAYS show model name (below Position Updates if they exist)
-    full_description += f"\n\n🤖 **Model Used:** {MODEL_NAME}"
+    parts.append("")
+    parts.append(f"🤖 **Model Used:** {MODEL_NAME}")
 
     # FIXED: Show levels from current position if exists, else from trade_data if new/invalid trade
-    current_status = (
-        positions_data.get("current_position", {}).get("status", "none")
-        if positions_data
-        else "none"
-    )
+    cp = positions_data.get("current_position", {}) if positions_data else {}
+    current_status = cp.get("status", "none")
     if current_status != "none":
         # Show existing position levels (if set)
-        entry = positions_data["current_position"].get("entry_price", "N/A")
-        stop = positions_data["current_position"].get("stop_loss", "N/A")
-        tp = positions_data["current_position"].get("take_profit", "N/A")
-        pl = positions_data["current_position"].get("unrealized_pnl", 0)
-        full_description += f"\n\n**📊 Current Position Levels:**"
-        full_description += (
-            f"\n🔵 Entry: ${entry:,.2f}"
-            if isinstance(entry, (int, float))
-            else f"\n🔵 Entry: {entry}"
-        )
-        full_description += (
-            f"\n🔴 Stop Loss: ${stop:,.2f}"
-            if isinstance(stop, (int, float))
-            else f"\n🔴 Stop Loss: {stop}"
-        )
-        full_description += (
-            f"\n🟢 Take Profit: ${tp:,.2f}"
-            if isinstance(tp, (int, float))
-            else f"\n🟢 Take Profit: {tp}"
-        )
-        full_description += f"\n💰 Current P/L: ${pl:+,.2f}"
+        entry = cp.get("entry_price", "N/A")
+        stop = cp.get("stop_loss", "N/A")
+        tp = cp.get("take_profit", "N/A")
+        pl = cp.get("unrealized_pnl", 0)
+        parts.append("")
+        parts.append("**📊 Current Position Levels:**")
+        parts.append(f"🔵 Entry: {_fmt_price(entry)}")
+        parts.append(f"🔴 Stop Loss: {_fmt_price(stop)}")
+        parts.append(f"🟢 Take Profit: {_fmt_price(tp)}")
+        parts.append(f"💰 Current P/L: ${pl:+,.2f}")
         if trade_data and "confidence" in trade_data:
-            full_description += f"\n📈 Confidence: {trade_data['confidence']}%"
+            parts.append(f"📈 Confidence: {trade_data['confidence']}%")
     elif trade_data and trade_data.get("action") != "hold":
         # Show proposed levels for new trades
-        is_invalid = any(
-            "Invalid trade levels" in r.get("message", "") for r in trade_results or []
-        )
-        if is_invalid:
-            full_description += f"\n\n**⚠️ Trade Rejected:** Signal was {trade_data.get('action', 'unknown').upper()} but validation failed (check stop distance, risk-reward ratio, or levels)"
-        else:
-            full_description += f"\n\n**📊 Trade Levels:**"
-            full_description += f"\n🔵 Entry: ${trade_data.get('entry_price', 0):,.2f}"
-            full_description += (
-                f"\n🔴 Stop Loss: ${trade_data.get('stop_loss', 0):,.2f}"
-            )
-            full_description += (
-                f"\n🟢 Take Profit: ${trade_data.get('take_profit', 0):,.2f}"
+        parts.append("")
+        if trade_invalid:
+            parts.append(
+                f"**⚠️ Trade Rejected:** Signal was {trade_data.get('action', 'unknown').upper()} but validation failed (check stop distance, risk-reward ratio, or levels)"
             )
+        else:
+            parts.append("**📊 Trade Levels:**")
+            parts.append(f"🔵 Entry: ${trade_data.get('entry_price', 0):,.2f}")
+            parts.append(f"🔴 Stop Loss: ${trade_data.get('stop_loss', 0):,.2f}")
+            parts.append(f"🟢 Take Profit: ${trade_data.get('take_profit', 0):,.2f}")
             if "confidence" in trade_data:
-                full_description += f"\n📈 Confidence: {trade_data['confidence']}%"
+                parts.append(f"📈 Confidence: {trade_data['confidence']}%")
 
     # Add real account balance if available
     if futures_balance or buying_power or daily_pnl is not None:
-        full_description += f"\n\n**💰 Account:**"
+        parts.append("")
+        parts.append("**💰 Account:**")
         if futures_balance:
-            full_description += f"\n💵 Total Balance: ${futures_balance:,.2f}"
+            parts.append(f"💵 Total Balance: ${futures_balance:,.2f}")
         if buying_power:
-            full_description += f"\n📊 Buying Power: ${buying_power:,.2f}"
+            parts.append(f"📊 Buying Power: ${buying_power:,.2f}")
         if daily_pnl is not None:
-            full_description += f"\n📈 Today's P/L: ${daily_pnl:+,.2f}"
+            parts.append(f"📈 Today's P/L: ${daily_pnl:+,.2f}")
 
     # Add performance stats (live stats without paper balance)
-    if positions_data:
-        total = positions_data.get("total_trades", 0)
-        if total > 0:
-            wins = positions_data.get("winning_trades", 0)
-            losses = positions_data.get("losing_trades", 0)
-            win_rate = (wins / total * 100) if total > 0 else 0
-
-            # Calculate average win/loss from trade history
-            trade_history = positions_data.get("trade_history", [])
-            total_profit = sum(
-                t["profit_loss"] for t in trade_history if t["profit_loss"] > 0
+    if positions_data and positions_data.get("total_trades", 0) > 0:
+        stats = compute_stats(positions_data)
+        parts.append("")
+        parts.append("**📈 Trading Stats:**")
+        parts.append(
+            f"📊 Trades: {stats['total']} ({stats['wins']}W / {stats['losses']}L)"
+        )
+        if stats["losses"] > 0:
+            parts.append(
+                f"📊 Avg W:L: {stats['avg_ratio']:.2f}:1 (avg win: ${stats['avg_win']:.2f}, avg loss: ${stats['avg_loss']:.2f})"
             )
-            total_loss = abs(
-                sum(t["profit_loss"] for t in trade_history if t["profit_loss"] < 0)
+        else:
+            parts.append(
+                f"📊 Avg W:L: Perfect! (${stats['avg_win']:.2f} avg win, no losses)"
             )
-            avg_win = (total_profit / wins) if wins > 0 else 0
-            avg_loss = (total_loss / losses) if losses > 0 else 0
-            avg_ratio = (avg_win / avg_loss) if avg_loss > 0 else avg_win
-
-            full_description += f"\n\n**📈 Trading Stats:**"
-            full_description += f"\n📊 Trades: {total} ({wins}W / {losses}L)"
-            if total > 0:
-                if losses > 0:
-                    full_description += f"\n📊 Avg W:L: {avg_ratio:.2f}:1 (avg win: ${avg_win:.2f}, avg loss: ${avg_loss:.2f})"
-                else:
-                    full_description += (
-                        f"\n📊 Avg W:L: Perfect! (${avg_win:.2f} avg win, no losses)"
-                    )
-                full_description += f"\n🎯 Win Rate: {win_rate:.1f}%"
-
-    # Determine trading mode for footer
-    trading_mode_text = "💰 LIVE TRADING"
+        parts.append(f"🎯 Win Rate: {stats['win_rate']:.1f}%")
+
+    # Join once at the end instead of growing the string piece by piece
+    full_description = "\n".join(parts)
+
+    # Discord rejects (400) descriptions over the limit: shorten the analysis
+    # text rather than the position/account/stats sections after it
+    overflow = len(full_description) - DISCORD_DESCRIPTION_LIMIT
+    if overflow > 0:
+        parts[0] = parts[0][: max(len(parts[0]) - overflow - 1, 0)] + "…"
+        full_description = "\n".join(parts)[:DISCORD_DESCRIPTION_LIMIT]
+
+    # Color by the parsed signal; only scan the analysis text if there is none
+    action = trade_data.get("action") if trade_data else None
+    if action in COLOR_BY_ACTION:
+        color = COLOR_BY_ACTION[action]
+    else:
+        analysis_lower = analysis.lower()
+        color = (
+            COLOR_BY_ACTION["buy"]
+            if "buy" in analysis_lower
+            else COLOR_BY_ACTION["hold"]
+            if "hold" in analysis_lower
+            else COLOR_BY_ACTION["sell"]
+        )
 
     # Format as Discord embed for better readability
-    payload = {
-        "embeds": [
-            {
-                "title": f"🪙 {CRYPTO_SYMBOL} Futures Bot ({FUTURES_PRODUCT_ID})",
-                "description": full_description,
-                "color": 0x00FF00
-                if "buy" in analysis.lower()
-                else 0xFFA500
-                if "hold" in analysis.lower()
-                else 0xFF0000,  # Green/Yellow/Red based on rec
-                "image": {"url": "attachment://chart.png"},
-                "footer": {
-                    "text": f"{trading_mode_text} | {CONTRACTS_PER_TRADE} contract(s) | {os.getenv('GITHUB_RUN_ID', 'Local')}"
-                },
-                "timestamp": datetime.now().isoformat(),
-            }
-        ]
+    embed = {
+        **_EMBED_TEMPLATE,
+        "description": full_description,
+        "color": color,
+        "timestamp": run_timestamp
+        or datetime.now(timezone.utc).isoformat(timespec="seconds"),
     }
+    payload = {"embeds": [embed]}
+
+    if chart_image is not None:
+        # Send with file attachment (zero-copy view of the PNG buffer, no read() copy)
+        embed["image"] = {"url": "attachment://chart.png"}
+        post_kwargs = {
+            "data": {"payload_json": _json_dumps(payload)},
+            "files": {"file": ("chart.png", chart_image.getbuffer(), "image/png")},
+        }
+    else:
+        post_kwargs = {
+            "data": _json_dumps(payload).encode(),
+            "headers": {"Content-Type": "application/json"},
+        }
 
-    # Send with file attachment
-    files = {"file": ("chart.png", chart_image, "image/png")}
-    data = {"payload_json": json.dumps(payload)}
-
-    response = requests.post(webhook_url, data=data, files=files)
+    try:
+        response = _HTTP.post(webhook_url, timeout=HTTP_TIMEOUT_SECONDS, **post_kwargs)
+    except requests.RequestException as e:
+        # Don't fail the run: positions.json still has to be committed by the workflow
+        print(f"Discord send failed: {e}")
+        return False
     if response.status_code != 204 and response.status_code != 200:
         print(f"Discord send failed: {response.status_code} - {response.text}")
-    else:
-        print("Analysis and chart sent to Discord successfully!")
+        return False
+    print(
+        "Analysis and chart sent to Discord successfully!"
+        if chart_image is not None
+        else "Analysis sent to Discord successfully!"
+    )
+    return True
 
 
 if __name__ == "__main__":
-    from coinbase.rest import RESTClient
-
+    # One timezone-aware timestamp for the whole run (embed + desync exit time)
+    run_time = datetime.now(timezone.utc)
+    run_timestamp = run_time.isoformat(timespec="seconds")
     trading_mode = "💰 LIVE TRADING"
-    print("=" * 70)
-    print(f"🤖 {CRYPTO_SYMBOL} FUTURES TRADING BOT - {trading_mode}")
-    print(f"📦 Product: {FUTURES_PRODUCT_ID}")
-    print(f"📊 Contracts per trade: {CONTRACTS_PER_TRADE}")
-    print("=" * 70)
+    print(
+        "\n".join(
+            [
+                "=" * 70,
+                f"🤖 {CRYPTO_SYMBOL} FUTURES TRADING BOT - {trading_mode}",
+                f"📦 Product: {FUTURES_PRODUCT_ID}",
+                f"📊 Contracts per trade: {CONTRACTS_PER_TRADE}",
+                "=" * 70,
+            ]
+        )
+    )
 
     print("\n⚠️  ⚠️  ⚠️  WARNING: LIVE TRADING MODE ENABLED ⚠️  ⚠️  ⚠️")
     print("This bot will execute REAL trades with REAL money!")
     print("=" * 70)
 
-    # Initialize Coinbase client (needed for both paper and real trading for data)
-    client = RESTClient(
-        api_key=os.getenv("COINBASE_API_KEY"),
-        api_secret=os.getenv("COINBASE_API_SECRET"),
-    )
+    # Coinbase client (shared with fetch_btc_data so the connection pool stays warm)
+    client = get_coinbase_client()
+
+    # Start the independent startup IO together: balance, local state, candles, live position
+    with ThreadPoolExecutor(max_workers=4) as startup_pool:
+        balance_future = startup_pool.submit(client.get_futures_balance_summary)
+        positions_future = startup_pool.submit(load_positions)
+        candles_future = startup_pool.submit(fetch_btc_data)
+        real_position_future = startup_pool.submit(get_current_futures_position, client)
 
     # Fetch real futures balance
     futures_balance = None
     buying_power = None
     daily_pnl = None
     try:
-        balance_summary = client.get_futures_balance_summary()
-        balance_summary_dict = (
-            balance_summary.to_dict() if hasattr(balance_summary, "to_dict") else {}
-        )
-        bal_sum = balance_summary_dict.get("balance_summary", {})
+        # Read the Amount fields ({"value": ...}) straight off the response object
+        bal_sum = _field(balance_future.result(), "balance_summary", None)
 
-        futures_balance = float(bal_sum.get("total_usd_balance", {}).get("value", 0))
-        buying_power = float(bal_sum.get("futures_buying_power", {}).get("value", 0))
-        daily_pnl = float(bal_sum.get("daily_realized_pnl", {}).get("value", 0))
+        futures_balance = float(
+            _field(bal_sum, "total_usd_balance", {}).get("value", 0)
+        )
+        buying_power = float(
+            _field(bal_sum, "futures_buying_power", {}).get("value", 0)
+        )
+        daily_pnl = float(_field(bal_sum, "daily_realized_pnl", {}).get("value", 0))
 
         print(f"💰 Total Balance: ${futures_balance:,.2f}")
         print(f"📊 Buying Power: ${buying_power:,.2f}")
@@ -1928,56 +2232,44 @@ if __name__ == "__main__":
         print(f"⚠️ Failed to fetch futures balance: {e}")
 
     # Load current position state
-    positions_data = load_positions()
-    print(
-        f"\n📊 Current Status: {positions_data['current_position']['status'].upper()}"
-    )
-    if positions_data["current_position"]["status"] != "none":
-        print(f"   Entry: ${positions_data['current_position']['entry_price']:,.2f}")
+    positions_data = positions_future.result()
+    cp = positions_data["current_position"]
+    trades_at_start = positions_data["total_trades"]
+    print(f"\n📊 Current Status: {cp['status'].upper()}")
+    if cp["status"] != "none":
+        print(f"   Entry: ${cp['entry_price']:,.2f}")
 
     # Show stats if there are any trades
-    total = positions_data.get("total_trades", 0)
-    if total > 0:
-        wins = positions_data.get("winning_trades", 0)
-        losses = positions_data.get("losing_trades", 0)
-        win_rate = (wins / total * 100) if total > 0 else 0
-
-        # Calculate average win/loss from trade history
-        trade_history = positions_data.get("trade_history", [])
-        total_profit = sum(
-            t["profit_loss"] for t in trade_history if t["profit_loss"] > 0
-        )
-        total_loss = abs(
-            sum(t["profit_loss"] for t in trade_history if t["profit_loss"] < 0)
-        )
-        avg_win = (total_profit / wins) if wins > 0 else 0
-        avg_loss = (total_loss / losses) if losses > 0 else 0
-        avg_ratio = (avg_win / avg_loss) if avg_loss > 0 else avg_win
-
-        print(f"\n📈 Trading Stats:")
-        print(f"   📊 Trades: {total} ({wins}W / {losses}L)")
-        if losses > 0:
-            print(
-                f"   📊 Avg W:L: {avg_ratio:.2f}:1 (avg win: ${avg_win:.2f}, avg loss: ${avg_loss:.2f})"
+    if positions_data.get("total_trades", 0) > 0:
+        stats = compute_stats(positions_data)
+        stats_lines = [
+            "\n📈 Trading Stats:",
+            f"   📊 Trades: {stats['total']} ({stats['wins']}W / {stats['losses']}L)",
+        ]
+        if stats["losses"] > 0:
+            stats_lines.append(
+                f"   📊 Avg W:L: {stats['avg_ratio']:.2f}:1 (avg win: ${stats['avg_win']:.2f}, avg loss: ${stats['avg_loss']:.2f})"
             )
         else:
-            print(f"   📊 Avg W:L: Perfect! (${avg_win:.2f} avg win, no losses)")
-        print(f"   🎯 Win Rate: {win_rate:.1f}%")
+            stats_lines.append(
+                f"   📊 Avg W:L: Perfect! (${stats['avg_win']:.2f} avg win, no losses)"
+            )
+        stats_lines.append(f"   🎯 Win Rate: {stats['win_rate']:.1f}%")
+        print("\n".join(stats_lines))
 
     # Fetch the data
     print(f"\n📥 Fetching {CRYPTO_SYMBOL} futures data from Coinbase...")
-    data = fetch_btc_data()
+    # DataFrame shared by analysis, position checks and chart
+    candles, data = candles_future.result()
     print("✅ Data fetched successfully\n")
 
     # Get current price
-    lines = data.strip().split("\n")
-    latest_candle = lines[-1].split(",")
-    current_price = float(latest_candle[4])
+    current_price = float(candles["Close"].iat[-1])
     print(f"💵 Current {CRYPTO_SYMBOL} Futures Price: ${current_price:,.2f}\n")
 
     # Get actual position from Coinbase and sync state
     print("\n📊 Checking actual futures position on Coinbase...")
-    real_position = get_current_futures_position(client)
+    real_position = real_position_future.result()
 
     trade_results = []  # Initialize here to collect desync if any
 
@@ -1992,10 +2284,10 @@ if __name__ == "__main__":
         print(f"   Unrealized P/L: ${real_position['unrealized_pnl']:+,.2f}")
 
         # Sync positions.json with actual Coinbase position
-        positions_data["current_position"]["status"] = real_position["side"].lower()
+        cp["status"] = real_position["side"].lower()
 
         # FIXED: Preserve local entry price if API returns 0 (common issue)
-        local_entry = positions_data["current_position"].get("entry_price")
+        local_entry = cp.get("entry_price")
         if real_position["entry_price"] == 0 and local_entry:
             # Keep local entry price, don't overwrite with 0
             print(
@@ -2003,126 +2295,115 @@ if __name__ == "__main__":
             )
         else:
             # Update with API entry price (only if non-zero or local is None)
-            positions_data["current_position"]["entry_price"] = real_position[
-                "entry_price"
-            ]
+            cp["entry_price"] = real_position["entry_price"]
 
-        positions_data["current_position"]["unrealized_pnl"] = real_position[
-            "unrealized_pnl"
-        ]  # Store for accurate P/L display
+        # Store for accurate P/L display
+        cp["unrealized_pnl"] = real_position["unrealized_pnl"]
 
         print("   🔄 Synced local state with Coinbase position")
     else:  # No error, but no position on API
-        local_has_pos = positions_data["current_position"]["status"] != "none"
+        local_has_pos = cp["status"] != "none"
         if local_has_pos:
             print(
                 "   ⚠️ API shows no position, but local has one. Assuming closed externally (e.g., stop hit)."
             )
-            # Detect which order was filled for accurate exit price and P/L
-            stop_order_id = positions_data["current_position"].get("stop_loss_order_id")
-            tp_order_id = positions_data["current_position"].get("take_profit_order_id")
+            # Detect whether the bracket order filled for accurate exit price and P/L
+            bracket_order_id = cp.get("bracket_order_id")
+            entry_order_id = cp.get("entry_order_id")
 
             exit_price = current_price  # Fallback
             reason = "externally"
-            filled_price = None
 
-            # Check stop order
-            if stop_order_id:
-                try:
-                    stop_order_resp = client.get_order(stop_order_id)
-                    stop_dict = (
-                        stop_order_resp.to_dict()
-                        if hasattr(stop_order_resp, "to_dict")
-                        else {}
+            # Look up the bracket and entry orders concurrently (before cancelling them)
+            order_lookups = {}
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                if bracket_order_id:
+                    order_lookups["bracket"] = pool.submit(
+                        client.get_order, bracket_order_id
+                    )
+                if entry_order_id:
+                    order_lookups["entry"] = pool.submit(
+                        client.get_order, entry_order_id
                     )
-                    order_info = stop_dict.get("order", {})
-                    if order_info.get("status") == "FILLED":
-                        filled_price = float(
-                            order_info.get("average_filled_price", current_price)
-                        )
-                        exit_price = filled_price
-                        reason = "stop_hit"
-                except Exception as e:
-                    print(f"Warning: Could not fetch stop order status: {e}")
 
-            # Check TP order
-            if tp_order_id and filled_price is None:  # If stop not filled
+            # Check bracket order (filled when either its stop or target leg hit)
+            if "bracket" in order_lookups:
                 try:
-                    tp_order_resp = client.get_order(tp_order_id)
-                    tp_dict = (
-                        tp_order_resp.to_dict()
-                        if hasattr(tp_order_resp, "to_dict")
-                        else {}
+                    order_info = _field(
+                        order_lookups["bracket"].result(), "order", None
                     )
-                    order_info = tp_dict.get("order", {})
-                    if order_info.get("status") == "FILLED":
-                        filled_price = float(
-                            order_info.get("average_filled_price", current_price)
+                    if _field(order_info, "status", None) == "FILLED":
+                        exit_price = float(
+                            _field(order_info, "average_filled_price", current_price)
                         )
-                        exit_price = filled_price
-                        reason = "target_hit"
+                        # Whichever level the fill landed closer to is the leg that fired
+                        stop = cp.get("stop_loss")
+                        target = cp.get("take_profit")
+                        if stop is not None and target is not None:
+                            reason = (
+                                "target_hit"
+                                if abs(exit_price - target) < abs(exit_price - stop)
+                                else "stop_hit"
+                            )
                 except Exception as e:
-                    print(f"Warning: Could not fetch TP order status: {e}")
-
-            # FIXED: Cancel any lingering orders (including entry order for unfilled limit orders)
-            entry_order_id = positions_data["current_position"].get("entry_order_id")
-            order_ids = [
-                oid for oid in [entry_order_id, stop_order_id, tp_order_id] if oid
-            ]
-            if order_ids:
-                print(
-                    f"   🚫 Cancelling {len(order_ids)} lingering orders (including unfilled entry)..."
-                )
-                cancel_pending_orders(client, order_ids)
+                    log.warning("Warning: Could not fetch bracket order status: %s", e)
 
             # FIXED: Check if entry order actually filled before recording P/L
             entry_was_filled = True  # Assume filled unless we find unfilled entry order
-            if entry_order_id:
+            if "entry" in order_lookups:
                 try:
-                    entry_order_resp = client.get_order(entry_order_id)
-                    entry_dict = (
-                        entry_order_resp.to_dict()
-                        if hasattr(entry_order_resp, "to_dict")
-                        else {}
+                    entry_order_info = _field(
+                        order_lookups["entry"].result(), "order", None
                     )
-                    entry_order_info = entry_dict.get("order", {})
-                    entry_status = entry_order_info.get("status", "UNKNOWN")
+                    entry_status = _field(entry_order_info, "status", "UNKNOWN")
                     if entry_status in ["OPEN", "PENDING", "QUEUED"]:
                         entry_was_filled = False
                         print(
                             f"   ⚠️ Entry order never filled (status: {entry_status}) - NOT recording P/L"
                         )
                 except Exception as e:
-                    print(f"Warning: Could not fetch entry order status: {e}")
+                    log.warning("Warning: Could not fetch entry order status: %s", e)
+
+            # FIXED: Cancel any lingering orders (including entry order for unfilled limit orders)
+            order_ids = [oid for oid in [entry_order_id, bracket_order_id] if oid]
+            order_ids += cp.pop("legacy_order_ids", [])  # Pre-bracket stop/target
+            if order_ids:
+                print(
+                    f"   🚫 Cancelling {len(order_ids)} lingering orders (including unfilled entry)..."
+                )
+                cancel_pending_orders(client, order_ids)
 
             # Calculate P/L only if entry was actually filled
-            entry = positions_data["current_position"]["entry_price"]
-            multiplier = CONTRACTS_PER_TRADE * CONTRACT_MULTIPLIER
+            entry = cp["entry_price"]
             if entry is not None and entry_was_filled:
-                if positions_data["current_position"]["status"] == "long":
-                    profit_loss = (exit_price - entry) * multiplier
+                if cp["status"] == "long":
+                    profit_loss = (exit_price - entry) * _POS_MULTIPLIER
                     trade_type = "long"
                     emoji = "✅" if profit_loss > 0 else "❌"
                 else:
-                    profit_loss = (entry - exit_price) * multiplier
+                    profit_loss = (entry - exit_price) * _POS_MULTIPLIER
                     trade_type = "short"
                     emoji = "✅" if profit_loss > 0 else "❌"
-                positions_data["trade_history"].append(
+                append_trade(
                     {
                         "type": trade_type,
                         "entry_price": entry,
                         "exit_price": exit_price,
                         "profit_loss": profit_loss,
-                        "entry_time": positions_data["current_position"]["entry_time"],
-                        "exit_time": datetime.now().isoformat(),
+                        "entry_time": cp["entry_time"],
+                        "entry_ts": cp["entry_ts"],
+                        "exit_time": run_timestamp,
+                        "exit_ts": int(run_time.timestamp()),
                         "note": f"Closed {reason} (desync detected)",
                     }
                 )
                 positions_data["total_trades"] += 1
                 if profit_loss > 0:
                     positions_data["winning_trades"] += 1
+                    positions_data["total_profit"] += profit_loss
                 else:
                     positions_data["losing_trades"] += 1
+                    positions_data["total_loss"] -= profit_loss
 
                 # Add to trade_results for Discord
                 trade_results.append(
@@ -2142,23 +2423,20 @@ if __name__ == "__main__":
         else:
             print("   ✅ No open position on Coinbase")
         # FIXED: Always clear local to match API (but only if no error)
-        positions_data["current_position"]["status"] = "none"
-        positions_data["current_position"]["entry_price"] = None
-        positions_data["current_position"]["entry_time"] = None
-        positions_data["current_position"]["stop_loss"] = None
-        positions_data["current_position"]["take_profit"] = None
-        positions_data["current_position"]["entry_order_id"] = None
-        positions_data["current_position"]["stop_loss_order_id"] = None
-        positions_data["current_position"]["take_profit_order_id"] = None
-        positions_data["current_position"]["unrealized_pnl"] = None
+        cp.update(_EMPTY_POSITION)
         if local_has_pos:
             print("   🔄 Local state cleared (desync resolved)")
         else:
             print("   🔄 Local state cleared (no position)")
 
+    # Import matplotlib/mplfinance in the background while waiting on the LLM;
+    # the chart itself needs the signal's levels, so it is drawn afterwards
+    background_pool = ThreadPoolExecutor(max_workers=2)
+    charting_future = background_pool.submit(_load_charting)
+
     # FIXED: Always run LLM analysis after position check (moved outside the else block)
     print("\n🧠 Analyzing with ChatGPT...")
-    analysis, trade_data = analyze_with_llm(data)
+    analysis, trade_data = analyze_with_llm(data, candles)
     print("✅ Analysis complete\n")
 
     # Print trade data for debugging
@@ -2169,54 +2447,86 @@ if __name__ == "__main__":
     # Manage positions (execute trades, check stops, etc.)
     print("💼 Managing positions...")
     manage_results = manage_positions(
-        positions_data, trade_data, current_price, data, client
+        positions_data, trade_data, current_price, candles, client
     )
     trade_results.extend(manage_results)
 
-    # Print trade results
-    if trade_results:
-        for result in trade_results:
-            print(f"   {result['message']}")
-    print()
+    # Print trade results (one write for the whole block)
+    print("".join(f"   {result['message']}\n" for result in trade_results))
 
-    # Save updated position state
-    save_positions(positions_data)
-    print("💾 Position state saved\n")
+    # Save updated position state in the background while the chart renders and
+    # the Discord post goes out (joined before the run ends)
+    save_future = background_pool.submit(
+        save_positions,
+        positions_data,
+        durable=positions_data["total_trades"] != trades_at_start,
+    )
 
-    # Check if trade was rejected by validation
-    trade_invalid = False
-    if trade_results:
-        for result in trade_results:
-            if not result.get("success", True) and "Invalid trade levels" in result.get(
-                "message", ""
-            ):
-                trade_invalid = True
-                break
+    # Check if trade was rejected by validation (shared by chart and Discord)
+    trade_invalid = any(
+        not result.get("success", True)
+        and "Invalid trade levels" in result.get("message", "")
+        for result in trade_results
+    )
 
-    # Generate chart with trade levels (and invalid flag if rejected)
-    chart_image = generate_chart(data, trade_data, trade_invalid)
-
-    # Send to Discord
-    webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
-    if webhook_url:
-        print("📤 Sending to Discord...")
-        send_to_discord(
-            analysis,
-            webhook_url,
-            chart_image,
-            trade_data,
-            trade_results,
-            positions_data,
-            futures_balance,
-            buying_power,
-            daily_pnl,
-        )
-    else:
-        print("⚠️  No Discord webhook configured")
+    # Quiet run: flat, HOLD signal and nothing happened. Skip the chart and the
+    # Discord post, unless the last post is QUIET_HEARTBEAT_MINUTES old (heartbeat).
+    # A HOLD that only comes from a failed LLM parse is never quiet
+    quiet_run = (
+        trade_data is not None
+        and trade_data.get("action") == "hold"
+        and not trade_data.get("parse_failed")
+        and positions_data["current_position"]["status"] == "none"
+        and all(r.get("message", "").startswith("⚪") for r in trade_results)
+    )
+    last_post_ts = positions_data.get("last_post_ts")
+    heartbeat_run = (
+        last_post_ts is None
+        or run_time.timestamp() - last_post_ts >= QUIET_HEARTBEAT_MINUTES * 60
+    )
+    posted = False
+    if quiet_run and not heartbeat_run:
+        print("😴 Flat with a HOLD signal - skipping chart and Discord post")
         print(f"\nLLM Analysis:\n{analysis}")
-        if trade_data:
-            print(f"\nTrade Data: {json.dumps(trade_data, indent=2)}")
-
-    print("\n" + "=" * 70)
-    print("✅ BOT RUN COMPLETE")
-    print("=" * 70)
+    else:
+        # Generate chart with trade levels (and invalid flag if rejected); a
+        # HOLD chart has no levels to show, so it is only drawn for the heartbeat
+        chart_image = None
+        action = trade_data.get("action") if trade_data else None
+        if action in ("buy", "sell") or heartbeat_run:
+            charting_future.result()
+            chart_image = generate_chart(candles, trade_data, trade_invalid)
+
+        # Send to Discord
+        webhook_url = DISCORD_WEBHOOK_URL
+        if webhook_url:
+            print("📤 Sending to Discord...")
+            posted = send_to_discord(
+                analysis,
+                webhook_url,
+                chart_image,
+                trade_data,
+                trade_results,
+                positions_data,
+                futures_balance,
+                buying_power,
+                daily_pnl,
+                trade_invalid,
+                run_timestamp,
+            )
+        else:
+            print("⚠️  No Discord webhook configured")
+            print(f"\nLLM Analysis:\n{analysis}")
+            if trade_data:
+                print(f"\nTrade Data: {_json_dumps(trade_data, indent=True)}")
+
+    save_future.result()
+    background_pool.shutdown()
+    if posted:
+        # Only a post that went out moves the heartbeat clock, so quiet runs
+        # leave positions.json (and the workflow's commit) untouched
+        positions_data["last_post_ts"] = int(run_time.timestamp())
+        save_positions(positions_data)
+    print("\n💾 Position state saved")
+
+    print("\n" + "=" * 70 + "\n✅ BOT RUN COMPLETE\n" + "=" * 70)
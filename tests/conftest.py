@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CoinbaseMain  # noqa: E402
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    """CoinbaseMain with a fresh in-memory state, run from an empty directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(CoinbaseMain._STATE, "data", None)
+    monkeypatch.setitem(CoinbaseMain._STATE, "text", None)
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    return CoinbaseMain
@@ -0,0 +1,54 @@
+TRADE_JSON = (
+    '{"action": "buy", "entry_price": 4000, "stop_loss": 3980, '
+    '"take_profit": 4050, "confidence": 70}'
+)
+
+
+def test_nested_json_response(bot):
+    response = '{"analysis": "Uptrend", "trade_data": ' + TRADE_JSON + "}"
+
+    analysis, trade_data = bot.parse_llm_response(response)
+
+    assert analysis == "Uptrend"
+    assert trade_data["action"] == "buy"
+
+
+def test_trade_json_after_prose(bot):
+    response = (
+        "**ANALYSIS**: Higher lows since 04:00.\n\n**TRADE_DATA**:\n" + TRADE_JSON
+    )
+
+    analysis, trade_data = bot.parse_llm_response(response)
+
+    assert analysis == "Higher lows since 04:00."
+    assert trade_data["stop_loss"] == 3980
+
+
+def test_stray_brace_in_prose_before_trade_json(bot):
+    response = (
+        "Price is ranging in {3990, 4010} and the {upper band never closes.\n"
+        + TRADE_JSON
+    )
+
+    analysis, trade_data = bot.parse_llm_response(response)
+
+    assert analysis.startswith("Price is ranging in {3990, 4010}")
+    assert trade_data["action"] == "buy"
+    assert trade_data["take_profit"] == 4050
+
+
+def test_object_without_action_is_skipped(bot):
+    response = 'Levels: {"support": 3990}\n' + TRADE_JSON
+
+    _, trade_data = bot.parse_llm_response(response)
+
+    assert trade_data["action"] == "buy"
+
+
+def test_no_trade_json(bot):
+    response = "I cannot produce JSON right now {"
+
+    analysis, trade_data = bot.parse_llm_response(response)
+
+    assert analysis == response
+    assert trade_data is None
@@ -0,0 +1,161 @@
+import json
+
+import pandas as pd
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return self._data
+
+
+class FakeClient:
+    """Records order calls in the order they were made"""
+
+    def __init__(self):
+        self.calls = []
+
+    def cancel_orders(self, order_ids):
+        self.calls.append(("cancel", list(order_ids)))
+
+    def _bracket(self, side, **kwargs):
+        self.calls.append((side, kwargs["stop_trigger_price"], kwargs["limit_price"]))
+        return FakeResponse(
+            {"success": True, "success_response": {"order_id": "bracket-1"}}
+        )
+
+    def trigger_bracket_order_gtc_sell(self, **kwargs):
+        return self._bracket("bracket_sell", **kwargs)
+
+    def trigger_bracket_order_gtc_buy(self, **kwargs):
+        return self._bracket("bracket_buy", **kwargs)
+
+
+def write_legacy_long():
+    """positions.json as written before bracket orders (open long, two exit orders)"""
+    state = {
+        "current_position": {
+            "status": "long",
+            "entry_price": 4000.0,
+            "entry_time": "2025-10-09T04:00:00+00:00",
+            "stop_loss": 3980.0,
+            "take_profit": 4050.0,
+            "trade_id": None,
+            "action": "buy",
+            "entry_order_id": "entry-1",
+            "stop_loss_order_id": "stop-1",
+            "take_profit_order_id": "target-1",
+            "unrealized_pnl": None,
+        },
+        "last_signal": "buy",
+        "total_trades": 0,
+        "winning_trades": 0,
+        "losing_trades": 0,
+        "total_profit": 0.0,
+        "total_loss": 0.0,
+    }
+    with open("positions.json", "w") as f:
+        json.dump(state, f)
+
+
+def quiet_candles():
+    """Candles after the entry that touch neither the stop nor the target"""
+    return pd.DataFrame(
+        {
+            "Timestamp": [1759990000, 1759990060],
+            "High": [4010.0, 4012.0],
+            "Low": [3995.0, 3996.0],
+        }
+    )
+
+
+def test_legacy_order_ids_are_queued_for_cancelling(bot):
+    write_legacy_long()
+
+    pos = bot.load_positions()["current_position"]
+
+    assert "stop_loss_order_id" not in pos
+    assert "take_profit_order_id" not in pos
+    assert pos["bracket_order_id"] is None
+    assert pos["legacy_order_ids"] == ["stop-1", "target-1"]
+
+
+def test_legacy_orders_cancelled_before_the_only_bracket(bot):
+    write_legacy_long()
+    positions_data = bot.load_positions()
+    client = FakeClient()
+    signal = {"action": "buy", "stop_loss": 3985.0, "take_profit": 4060.0}
+
+    bot.manage_positions(positions_data, signal, 4005.0, quiet_candles(), client)
+
+    assert client.calls == [
+        ("cancel", ["stop-1", "target-1"]),
+        ("bracket_sell", "3985", "4060"),
+    ]
+    pos = positions_data["current_position"]
+    assert pos["bracket_order_id"] == "bracket-1"
+    assert "legacy_order_ids" not in pos
+
+
+def test_no_bracket_while_legacy_cancel_fails(bot):
+    write_legacy_long()
+    positions_data = bot.load_positions()
+    client = FakeClient()
+
+    def failing_cancel(order_ids):
+        raise RuntimeError("exchange unavailable")
+
+    client.cancel_orders = failing_cancel
+    signal = {"action": "buy", "stop_loss": 3985.0, "take_profit": 4060.0}
+
+    bot.manage_positions(positions_data, signal, 4005.0, quiet_candles(), client)
+
+    assert client.calls == []
+    pos = positions_data["current_position"]
+    assert pos["bracket_order_id"] is None
+    assert pos["legacy_order_ids"] == ["stop-1", "target-1"]
+
+
+def test_closing_cancels_legacy_orders(bot, monkeypatch):
+    write_legacy_long()
+    positions_data = bot.load_positions()
+    client = FakeClient()
+    monkeypatch.setattr(
+        bot,
+        "execute_real_futures_trade",
+        lambda action, contracts, client, limit_price=None: {
+            "success": True,
+            "message": "CLOSED",
+            "order_id": "close-1",
+        },
+    )
+
+    bot.execute_trade("close_long", 4020.0, positions_data, client=client)
+
+    assert client.calls == [("cancel", ["entry-1", "stop-1", "target-1"])]
+    pos = positions_data["current_position"]
+    assert pos == bot._EMPTY_POSITION
+
+
+def test_closed_trade_records_unix_timestamps(bot, monkeypatch):
+    write_legacy_long()
+    positions_data = bot.load_positions()
+    monkeypatch.setattr(
+        bot,
+        "execute_real_futures_trade",
+        lambda action, contracts, client, limit_price=None: {
+            "success": True,
+            "message": "CLOSED",
+            "order_id": "close-1",
+        },
+    )
+
+    bot.execute_trade("close_long", 4020.0, positions_data, client=FakeClient())
+
+    with open("trades.jsonl") as f:
+        (trade,) = [json.loads(line) for line in f]
+    assert trade["entry_ts"] == 1759982400
+    exit_time = bot.datetime.fromisoformat(trade["exit_time"])
+    assert trade["exit_ts"] == int(exit_time.timestamp())
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+CANDLES = [  # Newest first, as the API returns them
+    {
+        "start": "1760000060",
+        "open": "4001",
+        "high": "4003",
+        "low": "3999",
+        "close": "4002",
+        "volume": "12.5",
+    },
+    {
+        "start": "1760000000",
+        "open": "4000",
+        "high": "4002",
+        "low": "3998",
+        "close": "4001",
+        "volume": "10",
+    },
+]
+
+
+class FakeCandleClient:
+    def __init__(self, response):
+        self.response = response
+
+    def get_candles(self, **kwargs):
+        return self.response
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        {"candles": [dict(c) for c in CANDLES]},  # plain dicts
+        SimpleNamespace(candles=[SimpleNamespace(**c) for c in CANDLES]),  # typed
+    ],
+    ids=["dict", "typed"],
+)
+def test_fetch_btc_data_reads_dict_and_typed_candles(bot, monkeypatch, response):
+    monkeypatch.setitem(bot._CLIENTS, "coinbase", FakeCandleClient(response))
+
+    candles, csv_data = bot.fetch_btc_data()
+
+    assert candles["Timestamp"].tolist() == [1760000000, 1760000060]
+    assert candles["Close"].tolist() == [4001.0, 4002.0]
+    assert csv_data.splitlines()[1] == "1760000000,4000.0,4002.0,3998.0,4001.0,10.0"
+
+
+def test_as_dict_passes_plain_dicts_through(bot):
+    order = {"success": True, "success_response": {"order_id": "abc"}}
+
+    assert bot._as_dict(order) is order